@@ -1,75 +1,86 @@
 import sys
 import os
-import base64
-import requests
-import json
 import random
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QLabel, QPushButton, QTextEdit, QFileDialog, QMessageBox,
-                             QHBoxLayout, QProgressBar, QCheckBox, QTabWidget,
+                             QHBoxLayout, QProgressBar, QCheckBox,
                              QListWidget, QDialog, QLineEdit, QFormLayout, QCalendarWidget,
-                             QComboBox, QScrollArea, QInputDialog)
-from PyQt6.QtGui import QPixmap, QImage, QIcon
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QDate, QUrl
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineSettings
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from twilio.rest import Client
+                             QComboBox, QScrollArea, QInputDialog, QListView)
+from PyQt6.QtGui import QImage, QIcon, QTextCursor
+from PyQt6.QtCore import Qt, QObject, pyqtSignal, QTimer, QDate
+from image_preprocess import shutdown_pool
+from sef_core import (GEMINI_API_URL, ANALYSIS_PROMPT, APP_DATA_DIR, ANALYSIS_CACHE_DIR, MOOD_LEVELS,
+                      build_analyzer, format_analysis_error)
+from analysis_jobs import AnalysisJobQueue, QueueFullError
+from batch_analysis import collect_images
+from batch_dialog import BatchAnalysisDialog
+from image_preview import PreviewLoader
+from mood_chart import MoodChart
+from mood_analytics import MoodAnalytics, mood_summary
+from mood_store import MoodStore
+from sef_storage import LocalStore
+from journal_model import JournalListModel
+from data_export import export_table, TransferCancelled
+from data_import import import_table
+from lazy_tabs import LazyTabWidget
+from transfer_dialog import TransferDialog, FILE_FILTER, with_suffix
+from twilio_client import TwilioClient
+from alert_outbox import AlertOutbox
+from emergency_dispatch import AlertDispatcher, SENT, FAILED
+from emergency_dialog import AlertStatusSignals, EmergencyStatusDialog
 
 # Replace with your actual API key
 GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro-latest:generateContent"
-
-class AnalysisThread(QThread):
-    analysis_complete = pyqtSignal(str)
-
-    def __init__(self, image_path):
-        super().__init__()
-        self.image_path = image_path
-
-    def run(self):
-        result = self.analyze_image_with_gemini()
-        self.analysis_complete.emit(result)
+STREAM_ANALYSIS = True
+# Uploads are downscaled to this longest edge and re-encoded at this JPEG quality
+MAX_IMAGE_EDGE = 1568
+IMAGE_QUALITY = 85
+# Interactive analysis: worker threads and maximum number of queued jobs
+ANALYSIS_WORKERS = 2
+ANALYSIS_QUEUE_DEPTH = 8
+# Batch analysis: concurrent workers and Gemini requests per minute (match your quota)
+BATCH_MAX_WORKERS = 4
+BATCH_REQUESTS_PER_MINUTE = 60
+# Community Forum: disk HTTP cache limit in MB (an offline copy of the page is kept as well)
+FORUM_CACHE_MB = 100
+
+class AnalysisSignals(QObject):
+    """Carries analysis job callbacks from worker threads to the GUI thread."""
+    analysis_complete = pyqtSignal(int, str)
+    partial_result = pyqtSignal(int, str)
+    image_prepared = pyqtSignal(int, str, int, int)
+
+    def __init__(self, analysis_jobs, parent=None):
+        super().__init__(parent)
+        self.analysis_jobs = analysis_jobs
 
-    def analyze_image_with_gemini(self):
-        with open(self.image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode('utf-8')
+    def submit(self, image_path):
+        return self.analysis_jobs.submit(image_path,
+                                         on_partial=self.partial_result.emit,
+                                         on_prepared=self.emit_prepared,
+                                         on_complete=self.emit_complete)
 
-        payload = {
-            "contents": [{
-                "parts": [
-                    {"text": "Analyze this image for signs of mental distress or unsafe conditions. Provide a detailed analysis and safety recommendations."},
-                    {"inline_data": {"mime_type": "image/jpeg", "data": image_data}}
-                ]
-            }]
-        }
+    def emit_prepared(self, job_id, prepared):
+        self.image_prepared.emit(job_id, prepared.mime_type, prepared.original_bytes, len(prepared.data))
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        try:
-            response = requests.post(f"{GEMINI_API_URL}?key={GEMINI_API_KEY}", 
-                                     headers=headers, 
-                                     data=json.dumps(payload))
-            response.raise_for_status()
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text']
-        except requests.exceptions.RequestException as e:
-            return f"Error: {str(e)}"
+    def emit_complete(self, job_id, result, error):
+        if error is not None:
+            result = format_analysis_error(error)
+        self.analysis_complete.emit(job_id, result)
 
 class MoodTracker(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, store, parent=None):
         super().__init__(parent)
+        self.store = store
         self.setWindowTitle("Mood Tracker")
         self.setGeometry(200, 200, 300, 250)
 
         layout = QVBoxLayout()
 
         self.mood_input = QComboBox()
-        self.mood_input.addItems(["Very Happy", "Happy", "Neutral", "Sad", "Very Sad"])
+        self.mood_input.addItems(list(reversed(MOOD_LEVELS)))
         self.date_picker = QCalendarWidget()
         self.notes_input = QTextEdit()
         self.notes_input.setPlaceholderText("Add any notes about your day...")
@@ -89,14 +100,17 @@ class MoodTracker(QDialog):
 
     def save_mood(self):
         mood = self.mood_input.currentText()
-        date = self.date_picker.selectedDate().toString(Qt.DateFormat.ISODate)
+        date = self.date_picker.selectedDate().toPyDate()
         notes = self.notes_input.toPlainText()
-        print(f"Mood '{mood}' saved for date {date} with notes: {notes}")
+        self.store.add_mood(date, mood, notes)
         self.accept()
 
 class JournalEntry(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, store, parent=None):
         super().__init__(parent)
+        self.store = store
+        self.entry_id = None
+        self.date = None
         self.setWindowTitle("Journal Entry")
         self.setGeometry(200, 200, 400, 300)
 
@@ -121,21 +135,58 @@ class JournalEntry(QDialog):
     def save_entry(self):
         title = self.title_input.text()
         content = self.content_input.toPlainText()
-        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Journal entry '{title}' saved on {date}")
+        self.date = datetime.now()
+        try:
+            self.entry_id = self.store.add_journal_entry(self.date, title, content)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Journal Entry", f"The entry could not be saved: {e}")
+            return
         self.accept()
 
 class SEFMentalHealthTool(QMainWindow):
     def __init__(self):
         super().__init__()
+        # Built here rather than at import time: the image preprocessing pool
+        # spawns workers that re-import this module.
+        self.image_analyzer = build_analyzer(GEMINI_API_KEY, GEMINI_API_URL, ANALYSIS_CACHE_DIR, ANALYSIS_PROMPT,
+                                             MAX_IMAGE_EDGE, IMAGE_QUALITY, stream=STREAM_ANALYSIS)
+        self.analysis_cache = self.image_analyzer.cache
+        self.gemini_client = self.image_analyzer.client
+        self.analysis_jobs = AnalysisJobQueue(self.image_analyzer, ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH)
+        self.current_job_id = None
+        self.analysis_signals = AnalysisSignals(self.analysis_jobs, self)
+        self.analysis_signals.partial_result.connect(self.on_partial_result)
+        self.analysis_signals.image_prepared.connect(self.on_image_prepared)
+        self.analysis_signals.analysis_complete.connect(self.on_analysis_complete)
+        self.preview_loader = PreviewLoader(parent=self)
+        self.preview_loader.preview_ready.connect(self.on_preview_ready)
+        self.preview_loader.preview_failed.connect(self.on_preview_failed)
+        # The mood history is loaded in full at startup; the journal is read a page at a time.
+        self.store = LocalStore(os.path.join(APP_DATA_DIR, "sef.db"))
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush_store)
+        self.mood_history = MoodStore()
+        self.load_mood_history()
+        self.mood_analytics = MoodAnalytics(self.mood_history)
+        self.journal_model = JournalListModel(self.store, parent=self)
+        self.emergency_contacts = self.store.load_contacts()
+        self.transfer = None
         self.initUI()
-        self.mood_history = []
-        self.journal_entries = []
-        self.emergency_contacts = []
+        self.update_mood_chart()
         self.twilio_sid = ''
         self.twilio_auth_token = ''
         self.twilio_phone_number = '+'
-        self.twilio_client = Client(self.twilio_sid, self.twilio_auth_token)
+        # Alerts are queued on disk first, so ones not yet sent when the app
+        # closed (or lost connectivity) go out on the next start.
+        self.alert_outbox = AlertOutbox(os.path.join(APP_DATA_DIR, "sef.db"))
+        self.alert_signals = AlertStatusSignals(self)
+        self.alert_signals.status_changed.connect(self.on_alert_status)
+        self.open_alerts = set()
+        self.twilio_client = None
+        self.alert_dispatcher = None
+        if self.alert_outbox.has_unsent():
+            QTimer.singleShot(0, self.get_alert_dispatcher)
 
     def initUI(self):
         self.setWindowTitle("SEF-Integrated Mental Health and Safety Support Tool")
@@ -148,7 +199,7 @@ class SEFMentalHealthTool(QMainWindow):
         main_layout = QVBoxLayout()
         central_widget.setLayout(main_layout)
 
-        self.tab_widget = QTabWidget()
+        self.tab_widget = LazyTabWidget()
         main_layout.addWidget(self.tab_widget)
 
         # Image Analysis Tab
@@ -171,6 +222,10 @@ class SEFMentalHealthTool(QMainWindow):
         self.analyze_button.clicked.connect(self.start_analysis)
         button_layout.addWidget(self.analyze_button)
 
+        self.batch_button = QPushButton("Analyze Folder")
+        self.batch_button.clicked.connect(self.start_batch_analysis)
+        button_layout.addWidget(self.batch_button)
+
         self.clear_button = QPushButton("Clear")
         self.clear_button.clicked.connect(self.clear_all)
         button_layout.addWidget(self.clear_button)
@@ -199,8 +254,12 @@ class SEFMentalHealthTool(QMainWindow):
         self.tab_widget.addTab(mood_tracker_tab, "Mood Tracker")
         mood_tracker_layout = QVBoxLayout(mood_tracker_tab)
 
-        self.mood_chart = FigureCanvas(plt.Figure(figsize=(5, 4), dpi=100))
-        mood_tracker_layout.addWidget(self.mood_chart)
+        self.mood_chart = MoodChart(self.mood_history, self.mood_analytics)
+        mood_tracker_layout.addWidget(self.mood_chart, 1)
+
+        self.mood_summary = QLabel()
+        self.mood_summary.setWordWrap(True)
+        mood_tracker_layout.addWidget(self.mood_summary)
 
         self.add_mood_button = QPushButton("Add Mood Entry")
         self.add_mood_button.clicked.connect(self.open_mood_tracker)
@@ -211,40 +270,37 @@ class SEFMentalHealthTool(QMainWindow):
         self.tab_widget.addTab(journal_tab, "Journal")
         journal_layout = QVBoxLayout(journal_tab)
 
-        self.journal_list = QListWidget()
+        search_layout = QHBoxLayout()
+        self.journal_search = QLineEdit()
+        self.journal_search.setPlaceholderText("Search journal...")
+        self.journal_search.setClearButtonEnabled(True)
+        search_layout.addWidget(self.journal_search)
+        self.journal_range = QComboBox()
+        self.journal_range.addItems(["Any time", "Past week", "Past month", "Past year"])
+        search_layout.addWidget(self.journal_range)
+        journal_layout.addLayout(search_layout)
+
+        # Search as you type, but only once typing pauses briefly.
+        self.journal_search_timer = QTimer(self)
+        self.journal_search_timer.setSingleShot(True)
+        self.journal_search_timer.timeout.connect(self.apply_journal_search)
+        self.journal_search.textChanged.connect(lambda: self.journal_search_timer.start(150))
+        self.journal_range.currentIndexChanged.connect(self.apply_journal_search)
+
+        self.journal_list = QListView()
+        self.journal_list.setUniformItemSizes(True)
+        self.journal_list.setModel(self.journal_model)
+        self.journal_list.doubleClicked.connect(self.view_journal_entry)
         journal_layout.addWidget(self.journal_list)
 
         self.add_journal_button = QPushButton("New Journal Entry")
         self.add_journal_button.clicked.connect(self.open_journal_entry)
         journal_layout.addWidget(self.add_journal_button)
 
-        # Resources Tab
-        resources_tab = QWidget()
-        self.tab_widget.addTab(resources_tab, "Resources")
-        resources_layout = QVBoxLayout(resources_tab)
-
-        self.resources_list = QListWidget()
-        self.resources_list.addItems([
-            "Crisis Hotline: 1-800-273-8255",
-            "Online Therapy: www.betterhelp.com",
-            "Mindfulness App: Headspace",
-            "Support Group Finder: www.supportgroups.com",
-            "Suicide Prevention Lifeline: 1-800-273-8255",
-            "National Alliance on Mental Illness: www.nami.org",
-            "Anxiety and Depression Association of America: www.adaa.org",
-            "https://sjd.kerala.gov.in/scheme-info.php?scheme_id=IDky"
-        ])
-        resources_layout.addWidget(self.resources_list)
-
-        # Community Forum Tab
-        forum_tab = QWidget()
-        self.tab_widget.addTab(forum_tab, "Community Forum")
-        forum_layout = QVBoxLayout(forum_tab)
-
-        self.forum_view = QWebEngineView()
-        self.forum_view.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        self.forum_view.setUrl(QUrl("https://sjd.kerala.gov.in/scheme-info.php?scheme_id=IDky"))
-        forum_layout.addWidget(self.forum_view)
+        # Tabs below are built the first time they are opened.
+        self.forum_view = None
+        self.tab_widget.add_lazy_tab(self.build_resources_tab, "Resources")
+        self.tab_widget.add_lazy_tab(self.build_forum_tab, "Community Forum")
 
         self.setStyleSheet("""
             QMainWindow, QTabWidget, QWidget {
@@ -262,7 +318,7 @@ class SEFMentalHealthTool(QMainWindow):
             QPushButton:hover {
                 background-color: #45a049;
             }
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QListView {
                 border: 1px solid #cccccc;
                 border-radius: 5px;
                 padding: 5px;
@@ -292,35 +348,112 @@ class SEFMentalHealthTool(QMainWindow):
             }
         """)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_mood_chart)
-        self.timer.start(60000)
+    def build_resources_tab(self, page):
+        resources_layout = QVBoxLayout(page)
+
+        self.resources_list = QListWidget()
+        self.resources_list.addItems([
+            "Crisis Hotline: 1-800-273-8255",
+            "Online Therapy: www.betterhelp.com",
+            "Mindfulness App: Headspace",
+            "Support Group Finder: www.supportgroups.com",
+            "Suicide Prevention Lifeline: 1-800-273-8255",
+            "National Alliance on Mental Illness: www.nami.org",
+            "Anxiety and Depression Association of America: www.adaa.org",
+            "https://sjd.kerala.gov.in/scheme-info.php?scheme_id=IDky"
+        ])
+        resources_layout.addWidget(self.resources_list)
+
+    def build_forum_tab(self, page):
+        forum_layout = QVBoxLayout(page)
+
+        # Imported here: QtWebEngine is by far the heaviest Qt module, and
+        # creating the view starts a Chromium process.
+        from forum_view import ForumView, forum_profile
+
+        forum_dir = os.path.join(APP_DATA_DIR, "forum")
+        self.forum_profile = forum_profile(forum_dir, FORUM_CACHE_MB, parent=self)
+        self.forum_view = ForumView("https://sjd.kerala.gov.in/scheme-info.php?scheme_id=IDky",
+                                    self.forum_profile, forum_dir)
+        self.forum_view.status_message.connect(lambda message: self.statusBar().showMessage(message, 10000))
+        forum_layout.addWidget(self.forum_view)
 
     def upload_image(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Open Image File", "", "Images (*.png *.jpg *.jpeg)")
         if file_name:
-            pixmap = QPixmap(file_name)
-            self.image_label.setPixmap(pixmap.scaled(400, 400, Qt.AspectRatioMode.KeepAspectRatio))
             self.image_path = file_name
+            self.image_label.setText("Loading preview...")
+            self.preview_loader.load(file_name)
+
+    def on_preview_ready(self, path, pixmap):
+        # Ignore previews for images that were replaced or cleared meanwhile.
+        if path == getattr(self, 'image_path', None):
+            self.image_label.setPixmap(pixmap)
+
+    def on_preview_failed(self, path, error):
+        if path == getattr(self, 'image_path', None):
+            self.image_label.setText(f"Could not load preview:\n{error}")
 
     def start_analysis(self):
         if not hasattr(self, 'image_path'):
             QMessageBox.warning(self, "No Image", "Please upload an image first.")
             return
 
+        try:
+            job = self.analysis_signals.submit(self.image_path)
+        except QueueFullError:
+            QMessageBox.warning(self, "Busy", "Too many analyses are queued. Please try again shortly.")
+            return
+
+        # Any earlier job is now superseded; its late signals are ignored below.
+        self.current_job_id = job.job_id
         self.progress_bar.show()
         self.analyze_button.setEnabled(False)
         self.output_text.clear()
 
-        self.analysis_thread = AnalysisThread(self.image_path)
-        self.analysis_thread.analysis_complete.connect(self.on_analysis_complete)
-        self.analysis_thread.start()
+    def start_batch_analysis(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder of Images")
+        if not folder:
+            return
+        image_paths = collect_images([folder])
+        if not image_paths:
+            QMessageBox.warning(self, "No Images", "The selected folder contains no PNG or JPEG images.")
+            return
+
+        dialog = BatchAnalysisDialog(self.image_analyzer, image_paths, os.path.join(APP_DATA_DIR, "batches"),
+                                     BATCH_REQUESTS_PER_MINUTE, BATCH_MAX_WORKERS, self)
+        dialog.show()
+
+    def on_image_prepared(self, job_id, mime_type, original_bytes, upload_bytes):
+        if job_id != self.current_job_id:
+            return
+        saved = original_bytes - upload_bytes
+        self.statusBar().showMessage(
+            f"Uploading {upload_bytes / 1024:.0f} KB {mime_type} "
+            f"({saved / 1024:.0f} KB saved from {original_bytes / 1024:.0f} KB original)")
+
+    def on_partial_result(self, job_id, chunk):
+        if job_id != self.current_job_id:
+            return
+        self.output_text.moveCursor(QTextCursor.MoveOperation.End)
+        self.output_text.insertPlainText(chunk)
 
-    def on_analysis_complete(self, result):
+    def on_analysis_complete(self, job_id, result):
+        if job_id != self.current_job_id:
+            return
+        self.current_job_id = None
         self.progress_bar.hide()
         self.analyze_button.setEnabled(True)
         self.output_text.setText(result)
 
+        stats = self.analysis_cache.stats()
+        flight_stats = self.image_analyzer.flight.stats()
+        self.statusBar().showMessage(
+            f"Analysis cache: {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate); "
+            f"{flight_stats['coalesced']} duplicate requests coalesced "
+            f"({flight_stats['coalescing_rate']:.0%})")
+
         if self.share_checkbox.isChecked():
             self.share_analysis(result)
 
@@ -333,19 +466,38 @@ class SEFMentalHealthTool(QMainWindow):
             return
 
         message = "Emergency support requested. Please check on the user."
-        for contact in self.emergency_contacts:
-            try:
-                self.twilio_client.messages.create(
-                    body=message,
-                    from_=self.twilio_phone_number,
-                    to=contact
-                )
-            except Exception as e:
-                print(f"Failed to send message to {contact}: {str(e)}")
-
-        QMessageBox.information(self, "Emergency Contact", "Emergency contacts have been notified. Help is on the way.")
+        # Sends run concurrently off the GUI thread; the dialog shows each contact's progress.
+        alert_id = self.get_alert_dispatcher().send(self.emergency_contacts, message)
+        self.open_alerts.add(alert_id)
+        dialog = EmergencyStatusDialog(alert_id, self.emergency_contacts, self.alert_signals, parent=self)
+        dialog.show()
+
+    def get_alert_dispatcher(self):
+        # The Twilio session and sender threads are only set up once there is something to send.
+        if self.alert_dispatcher is None:
+            self.twilio_client = TwilioClient(self.twilio_sid, self.twilio_auth_token)
+            self.alert_dispatcher = AlertDispatcher(self.alert_outbox, self.twilio_client, self.twilio_phone_number,
+                                                    on_update=self.alert_signals.status_changed.emit)
+            self.alert_dispatcher.start()
+        return self.alert_dispatcher
+
+    def shutdown_alerts(self):
+        # A send still running after the timeout needs the outbox; it is
+        # left open and the row is reconciled on the next start.
+        if self.alert_dispatcher is None or self.alert_dispatcher.shutdown():
+            self.alert_outbox.close()
+
+    def on_alert_status(self, alert_id, contact, status, detail):
+        # Alerts carried over from an earlier session have no dialog.
+        if alert_id not in self.open_alerts and status in (SENT, FAILED):
+            self.statusBar().showMessage(f"Queued emergency alert to {contact}: {status}", 10000)
 
     def clear_all(self):
+        if self.current_job_id is not None:
+            self.analysis_jobs.cancel(self.current_job_id)
+            self.current_job_id = None
+            self.progress_bar.hide()
+            self.analyze_button.setEnabled(True)
         self.image_label.clear()
         self.image_label.setText("Upload an image or drawing")
         self.output_text.clear()
@@ -353,47 +505,61 @@ class SEFMentalHealthTool(QMainWindow):
             del self.image_path
 
     def open_mood_tracker(self):
-        dialog = MoodTracker(self)
+        dialog = MoodTracker(self.store, self)
         if dialog.exec():
             mood = dialog.mood_input.currentText()
-            date = dialog.date_picker.selectedDate()
+            date = dialog.date_picker.selectedDate().toPyDate()
             notes = dialog.notes_input.toPlainText()
-            self.mood_history.append((date, mood, notes))
+            # Only moods logged for today have a meaningful hour of day.
+            hour = datetime.now().hour if date == datetime.now().date() else -1
+            self.mood_history.add(date, mood, notes, hour=hour)
+            self.schedule_flush()
             self.update_mood_chart()
 
+    def schedule_flush(self):
+        # Saves arriving close together are committed in one transaction.
+        self.flush_timer.start(1000)
+
+    def flush_store(self):
+        try:
+            self.store.flush()
+        except sqlite3.Error as e:
+            # Still queued (e.g. another window holds the database); try again shortly.
+            print(f"Could not save: {e}")
+            self.statusBar().showMessage(f"Saving failed, retrying: {e}", 5000)
+            self.schedule_flush()
+
+    def close_store(self):
+        try:
+            self.store.close()
+        except sqlite3.Error as e:
+            print(f"Unsaved changes were lost on exit: {e}")
+
+    def load_mood_history(self):
+        self.mood_history.clear()
+        for entry_id, date, mood, notes, hour in self.store.load_moods():
+            self.mood_history.add(date, mood, notes, entry_id=entry_id, hour=hour)
+
     def update_mood_chart(self):
-        ax = self.mood_chart.figure.subplots()
-        ax.clear()
-        dates = [item[0] for item in self.mood_history]
-        moods = [["Very Sad", "Sad", "Neutral", "Happy", "Very Happy"].index(item[1]) for item in self.mood_history]
-        ax.plot(dates, moods, 'o-')
-        ax.set_yticks(range(5))
-        ax.set_yticklabels(["Very Sad", "Sad", "Neutral", "Happy", "Very Happy"])
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Mood')
-        ax.set_title('Mood History')
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        self.mood_chart.figure.tight_layout()
-        self.mood_chart.draw()
+        self.mood_chart.mark_dirty()
+        self.mood_summary.setText(mood_summary(self.mood_analytics.stats()))
 
     def open_journal_entry(self):
-        dialog = JournalEntry(self)
+        dialog = JournalEntry(self.store, self)
         if dialog.exec():
             title = dialog.title_input.text()
             content = dialog.content_input.toPlainText()
-            date = datetime.now()
-            self.journal_entries.append((date, title, content))
-            self.update_journal_list()
-
-    def update_journal_list(self):
-        self.journal_list.clear()
-        for date, title, _ in reversed(self.journal_entries):
-            self.journal_list.addItem(f"{date.strftime('%Y-%m-%d %H:%M')} - {title}")
-        self.journal_list.itemDoubleClicked.connect(self.view_journal_entry)
-
-    def view_journal_entry(self, item):
-        index = self.journal_list.row(item)
-        date, title, content = self.journal_entries[-(index + 1)]
+            self.journal_model.add_entry(dialog.entry_id, dialog.date, title, len(content))
+            self.schedule_flush()
+
+    def apply_journal_search(self):
+        days = {1: 7, 2: 31, 3: 365}.get(self.journal_range.currentIndex())
+        since = datetime.now() - timedelta(days=days) if days else None
+        self.journal_model.set_filter(self.journal_search.text(), since)
+
+    def view_journal_entry(self, index):
+        entry_id, date, title, _ = self.journal_model.entry(index.row())
+        content = self.store.load_journal_content(entry_id)
         
         view_dialog = QDialog(self)
         view_dialog.setWindowTitle(f"Journal Entry: {title}")
@@ -414,7 +580,10 @@ class SEFMentalHealthTool(QMainWindow):
     def add_emergency_contact(self):
         contact, ok = QInputDialog.getText(self, "Add Emergency Contact", "Enter phone number:")
         if ok and contact:
-            self.emergency_contacts.append(contact)
+            if contact not in self.emergency_contacts:
+                self.emergency_contacts.append(contact)
+                self.store.add_contact(contact)
+                self.schedule_flush()
             QMessageBox.information(self, "Contact Added", f"Emergency contact {contact} added successfully.")
 
     def view_emergency_contacts(self):
@@ -444,23 +613,92 @@ class SEFMentalHealthTool(QMainWindow):
         export_dialog.exec()
 
     def export_mood_data(self):
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save Mood Data", "", "CSV Files (*.csv)")
-        if file_name:
-            with open(file_name, 'w') as f:
-                f.write("Date,Mood,Notes\n")
-                for date, mood, notes in self.mood_history:
-                    f.write(f"{date.toString(Qt.DateFormat.ISODate)},{mood},{notes.replace(',', ';')}\n")
-            QMessageBox.information(self, "Export Successful", "Mood data exported successfully.")
+        self.export_table("moods", "Save Mood Data")
 
     def export_journal_data(self):
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save Journal Entries", "", "Text Files (*.txt)")
-        if file_name:
-            with open(file_name, 'w') as f:
-                for date, title, content in self.journal_entries:
-                    f.write(f"Date: {date.strftime('%Y-%m-%d %H:%M')}\n")
-                    f.write(f"Title: {title}\n")
-                    f.write(f"Content:\n{content}\n\n")
-            QMessageBox.information(self, "Export Successful", "Journal entries exported successfully.")
+        self.export_table("journal", "Save Journal Entries")
+
+    def export_table(self, kind, caption):
+        file_name, selected_filter = QFileDialog.getSaveFileName(self, caption, "", FILE_FILTER)
+        if not file_name:
+            return
+        file_name = with_suffix(file_name, selected_filter)
+        # The export reads through its own connection, so queued writes go first.
+        self.flush_store()
+        db_path = self.store.path
+        self.start_transfer("Export", f"Exporting {kind}...",
+                            lambda progress, cancel_event: export_table(db_path, kind, file_name,
+                                                                        progress, cancel_event),
+                            self.on_export_finished)
+
+    def import_data(self):
+        import_dialog = QDialog(self)
+        import_dialog.setWindowTitle("Import Data")
+        import_dialog.setGeometry(200, 200, 300, 150)
+
+        layout = QVBoxLayout()
+        mood_button = QPushButton("Import Mood Data")
+        journal_button = QPushButton("Import Journal Entries")
+
+        layout.addWidget(mood_button)
+        layout.addWidget(journal_button)
+
+        import_dialog.setLayout(layout)
+
+        mood_button.clicked.connect(lambda: self.import_table("moods", "Open Mood Data"))
+        journal_button.clicked.connect(lambda: self.import_table("journal", "Open Journal Entries"))
+
+        import_dialog.exec()
+
+    def import_table(self, kind, caption):
+        file_name, _ = QFileDialog.getOpenFileName(self, caption, "", FILE_FILTER)
+        if not file_name:
+            return
+        # Queued rows go first so the import can skip their duplicates.
+        self.flush_store()
+        store = self.store
+        self.start_transfer("Import", f"Importing {kind}...",
+                            lambda progress, cancel_event: import_table(store, kind, file_name,
+                                                                        progress, cancel_event),
+                            lambda result, error: self.on_import_finished(kind, result, error))
+
+    def start_transfer(self, title, label, job, on_finished):
+        if self.transfer is not None:
+            QMessageBox.information(self, title, "Another export or import is still running.")
+            return
+        self.transfer = TransferDialog(title, label, job, on_finished, parent=self)
+
+    def stop_transfer(self):
+        if self.transfer is not None:
+            self.transfer.stop()
+
+    def on_export_finished(self, rows, error):
+        self.transfer = None
+        if isinstance(error, TransferCancelled):
+            self.statusBar().showMessage("Export cancelled", 5000)
+        elif error is not None:
+            QMessageBox.warning(self, "Export Failed", str(error))
+        else:
+            QMessageBox.information(self, "Export Successful", f"Exported {rows:,} rows.")
+
+    def on_import_finished(self, kind, result, error):
+        self.transfer = None
+        # Refresh even after a cancel or failure: earlier chunks are committed.
+        if kind == "moods":
+            self.load_mood_history()
+            self.update_mood_chart()
+        else:
+            self.apply_journal_search()
+        if isinstance(error, TransferCancelled):
+            self.statusBar().showMessage("Import cancelled; rows imported so far were kept", 5000)
+        elif error is not None:
+            QMessageBox.warning(self, "Import Failed", str(error))
+        else:
+            message = (f"Imported {result.inserted:,} rows ({result.rows_per_second:,.0f} rows/s).\n"
+                       f"Skipped {result.duplicates:,} duplicates and {result.invalid:,} invalid rows.")
+            if result.first_error:
+                message += f"\nFirst invalid row: {result.first_error}"
+            QMessageBox.information(self, "Import Complete", message)
 
     def show_breathing_exercise(self):
         breathing_dialog = QDialog(self)
@@ -539,6 +777,8 @@ class SEFMentalHealthTool(QMainWindow):
         crisis_dialog.exec()
 
 def main():
+    # Lets QtWebEngine be imported after the application exists (see the forum tab).
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     ex = SEFMentalHealthTool()
     
@@ -548,6 +788,9 @@ def main():
     
     export_action = file_menu.addAction('Export Data')
     export_action.triggered.connect(ex.export_data)
+
+    import_action = file_menu.addAction('Import Data')
+    import_action.triggered.connect(ex.import_data)
     
     tools_menu = menubar.addMenu('Tools')
     
@@ -568,7 +811,18 @@ def main():
     view_contacts_action = contacts_menu.addAction('View Emergency Contacts')
     view_contacts_action.triggered.connect(ex.view_emergency_contacts)
     
+    app.aboutToQuit.connect(ex.analysis_jobs.shutdown)
+    app.aboutToQuit.connect(shutdown_pool)
+    app.aboutToQuit.connect(ex.stop_transfer)
+    app.aboutToQuit.connect(ex.mood_chart.shutdown)
+    app.aboutToQuit.connect(ex.shutdown_alerts)
+    app.aboutToQuit.connect(ex.close_store)
+
     ex.show()
+    # Set by startup_profile.py, a development tool; never set in normal use.
+    if os.environ.get("SEF_STARTUP_PROBE"):
+        from startup_profile import report_window_shown
+        QTimer.singleShot(0, lambda: report_window_shown(app))
     sys.exit(app.exec())
 
 if __name__ == '__main__':
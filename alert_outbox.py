@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from sef_storage import connect
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    alert_id TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    message_sid TEXT,
+    last_error TEXT,
+    UNIQUE (alert_id, contact)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox(status, next_attempt_at);
+"""
+
+# Row states. "sending" is set (and committed) before a request goes out,
+# so after a crash those rows are exactly the ones whose fate is unknown.
+PENDING, SENDING, DELIVERED, FAILED = "pending", "sending", "delivered", "failed"
+
+OutboxMessage = namedtuple("OutboxMessage", "id alert_id contact body attempts claimed_at")
+
+
+class AlertOutbox:
+    """Durable SQLite queue of emergency texts, one row per contact.
+
+    Every message is committed before any attempt to send it, with
+    synchronous=FULL so it survives power loss as well as crashes.
+    State changes are guarded so marking a row delivered twice is harmless.
+    """
+
+    def __init__(self, path):
+        self.conn = connect(path)
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(OUTBOX_SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, contacts, body):
+        alert_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (alert_id, contact, body, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?)", [(alert_id, contact, body, now, now) for contact in contacts])
+        return alert_id
+
+    def claim_due(self, now, limit=50):
+        """Move due pending rows to "sending" and return them."""
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT id, alert_id, contact, body, attempts FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, limit)).fetchall()
+            self.conn.executemany("UPDATE outbox SET status = ?, claimed_at = ? WHERE id = ?",
+                                  [(SENDING, now, row[0]) for row in rows])
+        return [OutboxMessage(*row, now) for row in rows]
+
+    def in_doubt(self, exclude=()):
+        """Rows in "sending" other than `exclude` (the ones being sent right
+        now): interrupted by a crash, or sent without a clear answer."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, alert_id, contact, body, attempts, claimed_at FROM outbox WHERE status = ?",
+                (SENDING,)).fetchall()
+        return [OutboxMessage(*row) for row in rows if row[0] not in exclude]
+
+    def mark_delivered(self, message_id, sid):
+        """Returns False if the row was already delivered."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = ?, message_sid = ?, last_error = NULL WHERE id = ? AND status != ?",
+                (DELIVERED, sid, message_id, DELIVERED))
+        return cursor.rowcount > 0
+
+    def reschedule(self, message_id, next_attempt_at, error=None, count_attempt=True):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ?, attempts = attempts + ? "
+                "WHERE id = ? AND status = ?",
+                (PENDING, next_attempt_at, error, int(count_attempt), message_id, SENDING))
+
+    def mark_failed(self, message_id, error):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE outbox SET status = ?, last_error = ? WHERE id = ? AND status = ?",
+                              (FAILED, error, message_id, SENDING))
+
+    def has_unsent(self):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM outbox WHERE status IN (?, ?) LIMIT 1",
+                                    (PENDING, SENDING)).fetchone()
+        return row is not None
+
+    def next_due(self):
+        with self._lock:
+            (due,) = self.conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?",
+                                       (PENDING,)).fetchone()
+        return due
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
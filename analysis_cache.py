@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class AnalysisCache:
+    """Two-tier (memory LRU + disk) cache of Gemini analysis results."""
+
+    def __init__(self, cache_dir, memory_entries=64, max_disk_bytes=50 * 1024 * 1024,
+                 max_age_seconds=30 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_seconds
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._disk_bytes = sum(size for _, _, size in self._scan_disk())
+
+    @staticmethod
+    def make_key(image_bytes, prompt, model_url):
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(image_bytes).digest())
+        for part in (prompt, model_url):
+            encoded = part.encode('utf-8')
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key, record_stats=True):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += int(record_stats)
+                return self._memory[key]
+
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += int(record_stats)
+                return None
+            self.disk_hits += int(record_stats)
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+        self._write_disk(key, text)
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for path, _, _ in self._scan_disk():
+                self._remove(path)
+            self._disk_bytes = 0
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                with self._lock:
+                    self._disk_bytes -= self._remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, text):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"created": time.time(), "text": text}, f)
+            size = os.path.getsize(tmp_path)
+            with self._lock:
+                self._disk_bytes -= self._remove(path)
+                os.replace(tmp_path, path)
+                self._disk_bytes += size
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            self._remove(tmp_path)
+            print(f"Failed to write analysis cache entry: {str(e)}")
+
+    def _evict_disk(self):
+        now = time.time()
+        entries = sorted(self._scan_disk(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, mtime, size in entries:
+            if total <= self.max_disk_bytes and now - mtime <= self.max_age_seconds:
+                continue
+            total -= self._remove(path)
+        self._disk_bytes = total
+
+    def _scan_disk(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    @staticmethod
+    def _remove(path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
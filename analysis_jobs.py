@@ -0,0 +1,139 @@
+import itertools
+import queue
+import threading
+
+from single_flight import CallerAborted
+
+
+class JobCancelled(CallerAborted):
+    pass
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def event(self):
+        return self._event
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class AnalysisJob:
+    def __init__(self, job_id, image_path, on_partial, on_prepared, on_complete):
+        self.job_id = job_id
+        self.image_path = image_path
+        self.token = CancellationToken()
+        self.on_partial = on_partial
+        self.on_prepared = on_prepared
+        self.on_complete = on_complete
+
+
+class AnalysisJobQueue:
+    """Long-lived worker threads running ImageAnalyzer jobs from a bounded queue.
+
+    Submitting a job supersedes (cancels) every earlier one, and a cancelled
+    job never delivers its result. Callbacks run on worker threads:
+    `on_partial(job_id, chunk)`, `on_prepared(job_id, prepared)` and
+    `on_complete(job_id, result, error)` where exactly one of result/error is set.
+    """
+
+    def __init__(self, analyzer, num_workers=2, max_depth=8):
+        self.analyzer = analyzer
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._ids = itertools.count(1)
+        self._active = {}
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+                         for i in range(num_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, image_path, on_partial=None, on_prepared=None, on_complete=None, supersede=True):
+        noop = lambda *args: None
+        with self._lock:
+            job = AnalysisJob(next(self._ids), image_path, on_partial or noop,
+                              on_prepared or noop, on_complete or noop)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"Analysis queue is full ({self._queue.maxsize} jobs)")
+            if supersede:
+                for other in self._active.values():
+                    other.token.cancel()
+            self._active[job.job_id] = job
+        return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._active.get(job_id)
+        if job is not None:
+            job.token.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            for job in self._active.values():
+                job.token.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._active.pop(job.job_id, None)
+
+    def _count_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def _run(self, job):
+        if job.token.cancelled:
+            self._count_dropped()
+            return
+
+        def on_partial(chunk):
+            # Raising here aborts the streaming response mid-flight.
+            job.token.raise_if_cancelled()
+            job.on_partial(job.job_id, chunk)
+
+        result, error = None, None
+        try:
+            result = self.analyzer.analyze(job.image_path, on_partial=on_partial,
+                                           on_prepared=lambda prepared: job.on_prepared(job.job_id, prepared),
+                                           cancel_event=job.token.event)
+        except CallerAborted:
+            pass
+        except Exception as e:
+            error = e
+
+        if job.token.cancelled:
+            self._count_dropped()
+            return
+        job.on_complete(job.job_id, result, error)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sef_core import format_analysis_error
+from single_flight import CallerAborted
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter shared by all batch workers."""
+
+    def __init__(self, rate_per_minute, burst=1):
+        if not rate_per_minute > 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def collect_images(paths):
+    """Expand directories into their image files; keep explicit files as given."""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(os.path.join(path, name))
+        elif os.path.isfile(path):
+            images.append(path)
+    return [os.path.abspath(path) for path in images]
+
+
+class BatchManifest:
+    """Per-batch JSON Lines record of finished images, so an interrupted batch can resume.
+
+    Each finished image appends one line; when an image appears more than
+    once, its last line wins.
+    """
+
+    def __init__(self, manifest_dir, image_paths):
+        batch_id = hashlib.sha256("\n".join(sorted(image_paths)).encode('utf-8')).hexdigest()[:16]
+        os.makedirs(manifest_dir, exist_ok=True)
+        self.path = os.path.join(manifest_dir, f"batch_{batch_id}.jsonl")
+        self._lock = threading.Lock()
+        self.results = {}
+        # Set when a crash left the last line unterminated, so the next
+        # record starts on a line of its own.
+        self._newline = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                        self.results[record.pop("path")] = record
+                    except (ValueError, KeyError, AttributeError):
+                        continue  # e.g. a line cut short by a crash
+        except OSError:
+            pass
+
+    def completed(self, image_path):
+        return self.results.get(image_path, {}).get("status") == "done"
+
+    def record(self, image_path, status, latency, result):
+        entry = {"status": status, "latency": latency, "result": result}
+        line = json.dumps(dict(entry, path=image_path)) + "\n"
+        with self._lock:
+            self.results[image_path] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n" + line if self._newline else line)
+            self._newline = False
+
+
+class BatchRunner:
+    """Run an ImageAnalyzer over many images with bounded concurrency.
+
+    `on_update(image_path, status, latency, result)` is called from worker
+    threads; status is one of "queued", "running", "done", "error", "skipped".
+    """
+
+    def __init__(self, analyzer, image_paths, manifest, rate_limiter, max_workers=4, on_update=None):
+        self.analyzer = analyzer
+        self.image_paths = image_paths
+        self.manifest = manifest
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self.on_update = on_update or (lambda *args: None)
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        pending = []
+        for path in self.image_paths:
+            if self.manifest.completed(path):
+                entry = self.manifest.results[path]
+                self.on_update(path, "done", entry["latency"], entry["result"])
+            else:
+                self.on_update(path, "queued", 0.0, "")
+                pending.append(path)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for future in [pool.submit(self._analyze_one, path) for path in pending]:
+                future.result()
+
+    def _analyze_one(self, path):
+        if self.stop_event.is_set():
+            self.on_update(path, "skipped", 0.0, "")
+            return
+        self.on_update(path, "running", 0.0, "")
+        limiter = _StoppableLimiter(self.rate_limiter, self.stop_event)
+        start = time.perf_counter()
+        try:
+            result = self.analyzer.analyze(path, rate_limiter=limiter, cancel_event=self.stop_event)
+            status = "done"
+        except CallerAborted:
+            self.on_update(path, "skipped", 0.0, "")
+            return
+        except Exception as e:
+            result = format_analysis_error(e)
+            status = "error"
+        latency = time.perf_counter() - start
+        self.manifest.record(path, status, latency, result)
+        self.on_update(path, status, latency, result)
+
+
+class _Stopped(CallerAborted):
+    pass
+
+
+class _StoppableLimiter:
+    def __init__(self, bucket, stop_event):
+        self.bucket = bucket
+        self.stop_event = stop_event
+
+    def acquire(self):
+        if not self.bucket.acquire(self.stop_event):
+            raise _Stopped()
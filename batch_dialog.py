@@ -0,0 +1,104 @@
+import os
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QTextEdit)
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from batch_analysis import BatchManifest, BatchRunner, TokenBucket
+
+
+class BatchThread(QThread):
+    item_updated = pyqtSignal(str, str, float, str)
+
+    def __init__(self, runner):
+        super().__init__()
+        self.runner = runner
+        self.runner.on_update = self.item_updated.emit
+
+    def run(self):
+        self.runner.run()
+
+
+class BatchAnalysisDialog(QDialog):
+    def __init__(self, analyzer, image_paths, manifest_dir, requests_per_minute, max_workers, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Image Analysis")
+        self.setGeometry(150, 150, 800, 500)
+
+        self.paths = list(image_paths)
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.results = {}
+
+        layout = QVBoxLayout()
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(len(image_paths), 3)
+        self.table.setHorizontalHeaderLabels(["File", "Status", "Latency (s)"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for path, row in self.rows.items():
+            self.table.setItem(row, 0, QTableWidgetItem(os.path.basename(path)))
+            self.table.setItem(row, 1, QTableWidgetItem("queued"))
+            self.table.setItem(row, 2, QTableWidgetItem(""))
+        self.table.cellDoubleClicked.connect(self.view_result)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop_batch)
+        button_layout.addWidget(self.stop_button)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+        manifest = BatchManifest(manifest_dir, image_paths)
+        runner = BatchRunner(analyzer, image_paths, manifest, TokenBucket(requests_per_minute),
+                             max_workers=max_workers)
+        self.batch_thread = BatchThread(runner)
+        self.batch_thread.item_updated.connect(self.on_item_updated)
+        self.batch_thread.finished.connect(self.on_batch_finished)
+        self.batch_thread.start()
+
+    def on_item_updated(self, path, status, latency, result):
+        row = self.rows[path]
+        self.table.item(row, 1).setText(status)
+        self.table.item(row, 2).setText(f"{latency:.2f}" if latency else "")
+        self.results[path] = result
+        self.update_summary()
+
+    def update_summary(self):
+        statuses = [self.table.item(row, 1).text() for row in range(self.table.rowCount())]
+        finished = sum(status in ("done", "error") for status in statuses)
+        errors = statuses.count("error")
+        self.summary_label.setText(f"{finished}/{len(statuses)} analysed, {errors} failed")
+
+    def view_result(self, row, _column):
+        path = self.paths[row]
+        view_dialog = QDialog(self)
+        view_dialog.setWindowTitle(f"Analysis: {os.path.basename(path)}")
+        view_dialog.setGeometry(200, 200, 500, 400)
+        layout = QVBoxLayout()
+        result_text = QTextEdit()
+        result_text.setPlainText(self.results.get(path, ""))
+        result_text.setReadOnly(True)
+        layout.addWidget(result_text)
+        view_dialog.setLayout(layout)
+        view_dialog.exec()
+
+    def stop_batch(self):
+        self.batch_thread.runner.stop()
+        self.stop_button.setEnabled(False)
+
+    def on_batch_finished(self):
+        self.stop_button.setEnabled(False)
+        self.update_summary()
+
+    def closeEvent(self, event):
+        # In-flight requests finish in the background; the manifest lets the
+        # batch resume from here next time the same images are opened.
+        self.stop_batch()
+        super().closeEvent(event)
@@ -0,0 +1,96 @@
+import csv
+import datetime
+import gzip
+import json
+import os
+
+from sef_core import MOOD_LEVELS
+from sef_storage import connect
+
+# Both formats share these column names; data_import reads them back.
+MOOD_COLUMNS = ["Date", "Mood", "Notes"]
+JOURNAL_COLUMNS = ["Date", "Title", "Content"]
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+def detect_format(path):
+    """("csv" | "jsonl", gzipped) from a file name such as moods.jsonl.gz."""
+    name = path.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    return ("jsonl" if name.endswith((".jsonl", ".json")) else "csv"), compressed
+
+
+def open_text(path, mode, compressed):
+    if compressed:
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="", buffering=1 << 16)
+
+
+def _mood_rows(conn, chunk_size):
+    cursor = conn.execute("SELECT day, mood, notes FROM moods ORDER BY day, id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield [(datetime.date.fromordinal(day).isoformat(), MOOD_LEVELS[mood], notes)
+               for day, mood, notes in rows]
+
+
+def _journal_rows(conn, chunk_size):
+    cursor = conn.execute("SELECT created_at, title, content FROM journal ORDER BY created_at, id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def export_table(db_path, kind, out_path, progress=None, cancel_event=None, chunk_size=1000):
+    """Stream the "moods" or "journal" table to CSV/JSONL (optionally gzipped).
+
+    Runs on its own read connection, so it is safe on a worker thread while
+    the GUI keeps writing. The file is written under a temporary name and
+    only renamed into place once complete. Returns the number of rows.
+    """
+    fmt, compressed = detect_format(out_path)
+    columns, chunks = {
+        "moods": (MOOD_COLUMNS, _mood_rows),
+        "journal": (JOURNAL_COLUMNS, _journal_rows),
+    }[kind]
+
+    conn = connect(db_path)
+    tmp_path = f"{out_path}.part"
+    try:
+        (total,) = conn.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()
+        done = 0
+        with open_text(tmp_path, "w", compressed) as f:
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                write_rows = writer.writerows
+            else:
+                keys = [column.lower() for column in columns]
+
+                def write_rows(rows):
+                    f.write("".join(json.dumps(dict(zip(keys, row)), ensure_ascii=False) + "\n" for row in rows))
+
+            for rows in chunks(conn, chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise TransferCancelled()
+                write_rows(rows)
+                done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+        os.replace(tmp_path, out_path)
+        return done
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,147 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import time
+from collections import namedtuple
+
+from sef_core import MOOD_LEVELS
+from sef_storage import connect, JOURNAL_DATE_FORMAT
+from data_export import MOOD_COLUMNS, JOURNAL_COLUMNS, TransferCancelled, detect_format
+
+
+class ImportResult(namedtuple("ImportResult", "inserted duplicates invalid seconds first_error")):
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return (self.inserted + self.duplicates + self.invalid) / max(self.seconds, 1e-6)
+
+
+def _text(record, key):
+    value = record.get(key) or ""
+    if not isinstance(value, str):
+        raise TypeError(f"{key} must be text")
+    return value
+
+
+def _parse_mood(record):
+    day = datetime.date.fromisoformat(record["date"].strip()).toordinal()
+    mood = record["mood"].strip()
+    if mood not in MOOD_LEVELS:
+        raise ValueError(f"unknown mood {mood!r}")
+    return (day, MOOD_LEVELS.index(mood)), _text(record, "notes")
+
+
+def _parse_journal(record):
+    created_at = datetime.datetime.fromisoformat(record["date"].strip()).strftime(JOURNAL_DATE_FORMAT)
+    title = record["title"].strip()
+    if not title:
+        raise ValueError("empty title")
+    return (created_at, title), _text(record, "content")
+
+
+# kind -> (columns, row parser, key query, insert statement)
+_TABLES = {
+    "moods": (MOOD_COLUMNS, _parse_mood, "SELECT day, mood FROM moods",
+              "INSERT INTO moods (day, mood, notes, logged_at) VALUES (?, ?, ?, ?)"),
+    "journal": (JOURNAL_COLUMNS, _parse_journal, "SELECT created_at, title FROM journal",
+                "INSERT INTO journal (created_at, title, content) VALUES (?, ?, ?)"),
+}
+
+
+def _records(f, fmt, columns):
+    """Lower-cased dicts from a CSV (with header) or JSON Lines file; None for unparsable lines."""
+    keys = [column.lower() for column in columns]
+    if fmt == "csv":
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        missing = [key for key in keys if key not in header]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        for row in reader:
+            if row:
+                yield dict(zip(header, row))
+    else:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield None
+                continue
+            yield {key.lower(): value for key, value in record.items()} if isinstance(record, dict) else None
+
+
+def import_table(store, kind, in_path, progress=None, cancel_event=None, chunk_size=10000):
+    """Stream a file in the export format into the "moods" or "journal" table.
+
+    Rows are validated, and rows whose (date, mood) or (date, title) already
+    exist, in the database or earlier in the file, are skipped. Each chunk
+    is inserted in one transaction on a separate connection. Chunks
+    committed before a cancel are kept.
+    """
+    fmt, compressed = detect_format(in_path)
+    columns, parse, key_sql, insert_sql = _TABLES[kind]
+    started = time.monotonic()
+    size = os.path.getsize(in_path)
+    inserted = duplicates = invalid = 0
+    first_error = None
+
+    conn = connect(store.path)
+    try:
+        seen = set(conn.execute(key_sql))
+        with open(in_path, "rb") as raw:
+            binary = gzip.GzipFile(fileobj=raw) if compressed else raw
+            f = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+            batch = []
+
+            def write_batch():
+                now = time.time()
+                with conn:
+                    if kind == "moods":
+                        conn.executemany(insert_sql, [(day, mood, notes, now)
+                                                      for (day, mood), notes in batch])
+                    else:
+                        conn.executemany(insert_sql, [(created_at, title, content)
+                                                      for (created_at, title), content in batch])
+
+            for row_number, record in enumerate(_records(f, fmt, columns), start=1):
+                try:
+                    if record is None:
+                        raise ValueError("not a JSON object")
+                    key, extra = parse(record)
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    invalid += 1
+                    if first_error is None:
+                        first_error = f"row {row_number}: {e}"
+                else:
+                    if key in seen:
+                        duplicates += 1
+                    else:
+                        seen.add(key)
+                        batch.append((key, extra))
+
+                done = inserted + len(batch) + duplicates + invalid
+                if done % chunk_size == 0:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise TransferCancelled()
+                    if batch:
+                        write_batch()
+                        inserted += len(batch)
+                        batch = []
+                    if progress is not None:
+                        # Rows left are unknown until the end; extrapolate from bytes read.
+                        progress(done, max(done, round(done * size / max(raw.tell(), 1))))
+            if batch:
+                write_batch()
+                inserted += len(batch)
+            if progress is not None:
+                done = inserted + duplicates + invalid
+                progress(done, done)
+    finally:
+        conn.close()
+    return ImportResult(inserted, duplicates, invalid, time.monotonic() - started, first_error)
@@ -0,0 +1,68 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+                             QHeaderView)
+from PyQt6.QtGui import QColor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from emergency_dispatch import WAITING, SENT, FAILED
+
+STATUS_COLORS = {WAITING: QColor("#f7ecc5"), SENT: QColor("#c8f7c5"), FAILED: QColor("#f7c5c5")}
+
+
+class AlertStatusSignals(QObject):
+    """Carries dispatcher updates (alert_id, contact, status, detail) from
+    worker threads to the GUI thread."""
+    status_changed = pyqtSignal(str, str, str, str)
+
+
+class EmergencyStatusDialog(QDialog):
+    """Live delivery status for one emergency alert, one row per contact."""
+
+    def __init__(self, alert_id, contacts, signals, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Emergency Contacts")
+        self.setGeometry(200, 200, 500, 300)
+        self.alert_id = alert_id
+        self.rows = {contact: row for row, contact in enumerate(contacts)}
+
+        layout = QVBoxLayout()
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(len(contacts), 3)
+        self.table.setHorizontalHeaderLabels(["Contact", "Status", "Detail"])
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for contact, row in self.rows.items():
+            self.table.setItem(row, 0, QTableWidgetItem(contact))
+            self.table.setItem(row, 1, QTableWidgetItem("queued"))
+            self.table.setItem(row, 2, QTableWidgetItem(""))
+        layout.addWidget(self.table)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button)
+        self.setLayout(layout)
+
+        signals.status_changed.connect(self.on_status_changed)
+        self.update_summary()
+
+    def on_status_changed(self, alert_id, contact, status, detail):
+        row = self.rows.get(contact)
+        if alert_id != self.alert_id or row is None:
+            return
+        self.table.item(row, 1).setText(status)
+        self.table.item(row, 2).setText(detail)
+        for column in range(3):
+            self.table.item(row, column).setBackground(STATUS_COLORS.get(status, QColor("white")))
+        self.update_summary()
+
+    def update_summary(self):
+        statuses = [self.table.item(row, 1).text() for row in range(self.table.rowCount())]
+        sent, failed = statuses.count(SENT), statuses.count(FAILED)
+        pending = len(statuses) - sent - failed
+        text = f"{sent}/{len(statuses)} contacts notified"
+        if failed:
+            text += f", {failed} failed"
+        if pending:
+            text += f", {pending} in progress"
+        self.summary_label.setText(text)
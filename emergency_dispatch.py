@@ -0,0 +1,172 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from twilio_client import describe_error, in_doubt, is_permanent, never_sent
+
+# Per-contact states reported through `on_update(alert_id, contact, status, detail)`.
+SENDING, RETRYING, WAITING, SENT, FAILED = "sending", "retrying", "waiting", "sent", "failed"
+
+
+class AlertDispatcher:
+    """Drains an AlertOutbox in the background, one worker per message.
+
+    Due messages are sent concurrently, so one slow or failing number never
+    delays the others. A message that never reached Twilio (offline) is
+    retried every `offline_retry` seconds, so queued alerts go out within
+    seconds of connectivity returning; other failures back off
+    exponentially. When it is unclear whether a send went out (no reply, a
+    5xx, or a crash mid-send) Twilio's sent messages are checked before
+    sending again, so neither a retry nor a restart texts anyone twice.
+    `on_update` is called from worker threads.
+    """
+
+    def __init__(self, outbox, client, from_number, on_update=None, max_workers=8, offline_retry=5.0,
+                 backoff_base=10.0, backoff_cap=300.0, max_attempts=20, idle_wait=60.0):
+        self.outbox = outbox
+        self.client = client
+        self.from_number = from_number
+        self.on_update = on_update
+        self.offline_retry = offline_retry
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_attempts = max_attempts
+        self.idle_wait = idle_wait
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alert")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._futures = set()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._next_check = 0.0
+        self._doubtful = False
+        self._thread = threading.Thread(target=self._run, name="alert-outbox", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def send(self, contacts, body):
+        """Record an alert durably, then wake the sender; returns its alert id."""
+        alert_id = self.outbox.enqueue(contacts, body)
+        self._wake.set()
+        return alert_id
+
+    def shutdown(self, timeout=5.0):
+        """Stop, waiting up to `timeout` seconds for sends in progress.
+
+        Returns False if some are still running; the outbox must then stay
+        open for them. Their rows are reconciled on the next start.
+        """
+        deadline = time.monotonic() + timeout
+        self._stopping.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            futures = set(self._futures)
+        _, running = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        return not running and not self._thread.is_alive()
+
+    def _update(self, alert_id, contact, status, detail=""):
+        if self.on_update is not None:
+            self.on_update(alert_id, contact, status, detail)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            now = time.time()
+            with self._lock:
+                if now >= self._next_check:
+                    self._doubtful = self._submit(self.outbox.in_doubt(exclude=self._in_flight), self._check)
+                    self._next_check = now + self.offline_retry
+                self._submit(self.outbox.claim_due(now), self._deliver)
+
+            timeout = self.idle_wait
+            due = self.outbox.next_due()
+            if due is not None:
+                timeout = min(timeout, due - now)
+            if self._doubtful:
+                timeout = min(timeout, self._next_check - now)
+            self._wake.wait(max(0.0, timeout))
+
+    def _submit(self, messages, work):
+        for message in messages:
+            self._in_flight.add(message.id)
+            try:
+                future = self.executor.submit(self._guarded, work, message)
+            except RuntimeError:
+                # Shutting down; the row stays in the outbox for next time.
+                self._in_flight.discard(message.id)
+                continue
+            self._futures.add(future)
+            future.add_done_callback(self._forget)
+        return bool(messages)
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _guarded(self, work, message):
+        try:
+            work(message)
+        finally:
+            with self._lock:
+                self._in_flight.discard(message.id)
+            self._wake.set()
+
+    def _deliver(self, message):
+        alert_id, contact = message.alert_id, message.contact
+        self._update(alert_id, contact, SENDING, f"attempt {message.attempts + 1}" if message.attempts else "")
+        try:
+            result = self.client.send_sms(
+                contact, self.from_number, message.body,
+                on_retry=lambda attempt: self._update(alert_id, contact, RETRYING, f"attempt {attempt + 1}"))
+        except Exception as e:
+            self._handle_failure(message, e)
+            return
+        self.outbox.mark_delivered(message.id, result.get("sid"))
+        self._update(alert_id, contact, SENT, result.get("status", ""))
+
+    def _handle_failure(self, message, error):
+        alert_id, contact = message.alert_id, message.contact
+        reason = describe_error(error)
+        if never_sent(error):
+            self.outbox.reschedule(message.id, time.time() + self.offline_retry, reason, count_attempt=False)
+            self._update(alert_id, contact, WAITING, f"{reason}; retrying every {self.offline_retry:g} s")
+        elif is_permanent(error):
+            self.outbox.mark_failed(message.id, reason)
+            self._update(alert_id, contact, FAILED, reason)
+        elif in_doubt(error):
+            # The message may have been created: the row stays "sending" until _check settles it.
+            self._next_check = 0.0
+            self._update(alert_id, contact, WAITING, f"{reason}; checking whether it was sent")
+        elif message.attempts + 1 >= self.max_attempts:
+            self.outbox.mark_failed(message.id, reason)
+            self._update(alert_id, contact, FAILED, reason)
+        else:
+            delay = self._backoff(message.attempts)
+            self.outbox.reschedule(message.id, time.time() + delay, reason)
+            self._update(alert_id, contact, WAITING, f"{reason}; retrying in {delay:g} s")
+
+    def _backoff(self, attempts):
+        return min(self.backoff_cap, self.backoff_base * 2 ** attempts)
+
+    def _check(self, message):
+        """Settle a message whose last send attempt has no known outcome."""
+        try:
+            # A few seconds of slack for clock skew against Twilio's timestamps.
+            sid = self.client.find_sent(message.contact, self.from_number, message.body, message.claimed_at - 5)
+        except Exception:
+            return  # Still offline; checked again on the next pass.
+        if sid is not None:
+            self.outbox.mark_delivered(message.id, sid)
+            self._update(message.alert_id, message.contact, SENT, "confirmed")
+        elif message.attempts + 1 >= self.max_attempts:
+            self.outbox.mark_failed(message.id, "Not sent")
+            self._update(message.alert_id, message.contact, FAILED, "Not sent")
+        else:
+            # Not sent after all: resend at once the first time, then back off.
+            delay = self._backoff(message.attempts - 1) if message.attempts else 0.0
+            self.outbox.reschedule(message.id, time.time() + delay, "Not sent")
+            self._update(message.alert_id, message.contact, WAITING, f"Not sent; retrying in {delay:g} s")
@@ -0,0 +1,101 @@
+import os
+import time
+
+from PyQt6.QtCore import QUrl, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import (QWebEngineProfile, QWebEnginePage, QWebEngineSettings,
+                                   QWebEngineDownloadRequest)
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+SNAPSHOT_NAME = "last_good.mhtml"
+
+
+def forum_profile(storage_dir, cache_size_mb, parent=None):
+    """Named, persistent profile: disk HTTP cache capped at `cache_size_mb`,
+    cookies and local storage kept in `storage_dir` across launches."""
+    profile = QWebEngineProfile("sef-forum", parent)
+    profile.setPersistentStoragePath(os.path.join(storage_dir, "storage"))
+    profile.setCachePath(os.path.join(storage_dir, "cache"))
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(int(cache_size_mb * 1024 * 1024))
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
+    profile.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
+    return profile
+
+
+class ForumView(QWebEngineView):
+    """Forum page that opens instantly and keeps working offline.
+
+    After every successful load the page is saved as a single MHTML file.
+    On the next launch that copy is shown at once while the live page loads
+    in a hidden QWebEnginePage, revalidating against the HTTP cache; once it
+    has loaded it replaces the copy. When it cannot load (offline) the copy
+    stays up, `status_message` says how old it is, and the live page is
+    tried again every `retry_interval` seconds.
+    """
+    status_message = pyqtSignal(str)
+
+    def __init__(self, url, profile, storage_dir, retry_interval=60, parent=None):
+        super().__init__(parent)
+        self.url = QUrl(url)
+        self.profile = profile
+        self.snapshot_path = os.path.join(storage_dir, SNAPSHOT_NAME)
+        self._saving_path = self.snapshot_path + ".part"
+        self._live_page = None
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.setInterval(int(retry_interval * 1000))
+        self._retry_timer.timeout.connect(self._revalidate)
+        os.makedirs(storage_dir, exist_ok=True)
+        profile.downloadRequested.connect(self._on_download_requested)
+
+        if os.path.exists(self.snapshot_path):
+            self.setPage(QWebEnginePage(profile, self))
+            self.load(QUrl.fromLocalFile(self.snapshot_path))
+            self._revalidate()
+        else:
+            self._show_live(QWebEnginePage(profile, self))
+
+    def _revalidate(self):
+        self._live_page = QWebEnginePage(self.profile, self)
+        self._live_page.loadFinished.connect(self._on_revalidated)
+        self._live_page.load(self.url)
+
+    def _on_revalidated(self, ok):
+        page, self._live_page = self._live_page, None
+        page.loadFinished.disconnect(self._on_revalidated)
+        if ok:
+            self._show_live(page, loaded=True)
+        else:
+            page.deleteLater()
+            saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getmtime(self.snapshot_path)))
+            self.status_message.emit(f"Community Forum is offline; showing the copy saved {saved}")
+            self._retry_timer.start()
+
+    def _show_live(self, page, loaded=False):
+        # The page replaced here is a child of the view, so setPage deletes it.
+        self.setPage(page)
+        page.loadFinished.connect(self._on_live_loaded)
+        if loaded:
+            self._save_snapshot()
+        else:
+            page.load(self.url)
+
+    def _on_live_loaded(self, ok):
+        # Only the forum page itself is kept, not wherever the user browsed to.
+        if ok and self.page().requestedUrl() == self.url:
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        # Written next to the last good copy and swapped in once complete.
+        self.page().save(self._saving_path, QWebEngineDownloadRequest.SavePageFormat.MimeHtmlSaveFormat)
+
+    def _on_download_requested(self, download):
+        path = os.path.join(download.downloadDirectory(), download.downloadFileName())
+        if download.isSavePageDownload() and os.path.abspath(path) == os.path.abspath(self._saving_path):
+            download.isFinishedChanged.connect(lambda: self._on_snapshot_saved(download))
+
+    def _on_snapshot_saved(self, download):
+        if download.state() == QWebEngineDownloadRequest.DownloadState.DownloadCompleted:
+            os.replace(self._saving_path, self.snapshot_path)
+        elif os.path.exists(self._saving_path):
+            os.remove(self._saving_path)
@@ -0,0 +1,85 @@
+import json
+
+from http_client import RetryingClient
+
+# finishReason values that end a usable answer; SAFETY, RECITATION and the
+# like stop generation without one.
+COMPLETE_FINISH_REASONS = ("STOP", "MAX_TOKENS")
+
+
+class IncompleteResponse(Exception):
+    """Gemini answered without usable text: blocked, stopped early, or empty."""
+
+
+class _Completion:
+    """Tracks the first candidate's text and finish reason across response chunks."""
+
+    def __init__(self):
+        self.has_text = False
+        self.finish_reason = None
+        self.block_reason = None
+
+    def feed(self, response):
+        """Record one response object; returns its text parts."""
+        self.block_reason = response.get("promptFeedback", {}).get("blockReason") or self.block_reason
+        texts = []
+        for candidate in response.get("candidates", [])[:1]:
+            self.finish_reason = candidate.get("finishReason") or self.finish_reason
+            texts += [part["text"] for part in candidate.get("content", {}).get("parts", []) if part.get("text")]
+        self.has_text = self.has_text or bool(texts)
+        return texts
+
+    def check(self):
+        if self.block_reason:
+            raise IncompleteResponse(f"request blocked by Gemini ({self.block_reason})")
+        if self.finish_reason is None:
+            raise IncompleteResponse("response ended before it was complete")
+        if self.finish_reason not in COMPLETE_FINISH_REASONS:
+            raise IncompleteResponse(f"response stopped by Gemini ({self.finish_reason})")
+        if not self.has_text:
+            raise IncompleteResponse("response contained no text")
+
+
+class GeminiClient(RetryingClient):
+    """Thread-safe Gemini REST client sharing one pooled keep-alive session.
+
+    `api_url` is the full `...:generateContent` endpoint, so tests can point
+    it at a local stand-in server. The streaming endpoint is derived from it.
+    """
+
+    def __init__(self, api_key, api_url, connect_timeout=5.0, read_timeout=90.0,
+                 max_retries=3, backoff_base=0.5, backoff_cap=8.0, pool_size=8):
+        super().__init__(connect_timeout, read_timeout, max_retries, backoff_base, backoff_cap, pool_size)
+        self.api_key = api_key
+        self.api_url = api_url
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key,
+        })
+
+    def generate_text(self, payload):
+        """Text of the first candidate; IncompleteResponse if there is none."""
+        completion = _Completion()
+        text = "".join(completion.feed(self.post(self.api_url, payload).json()))
+        completion.check()
+        return text
+
+    def stream_generate_content(self, payload):
+        """Yield text chunks from the `streamGenerateContent` SSE endpoint.
+
+        Raises IncompleteResponse after the last chunk if the stream was
+        blocked, carried no text, or ended without a finish reason.
+        """
+        url = self.api_url.replace(":generateContent", ":streamGenerateContent")
+        response = self.post(url, payload, params={"alt": "sse"}, stream=True)
+        completion = _Completion()
+        with response:
+            response.encoding = response.encoding or "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                yield from completion.feed(json.loads(line[len("data:"):]))
+        completion.check()
+
+    def post(self, url, payload, **kwargs):
+        return super().post(url, json=payload, **kwargs)
@@ -0,0 +1,80 @@
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryingClient:
+    """Thread-safe base for REST clients sharing one pooled keep-alive session.
+
+    `request` retries connection failures and 429/5xx responses with
+    full-jitter exponential backoff, honouring Retry-After. Read timeouts
+    are not retried: the request may still be running server-side.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=90.0, max_retries=3,
+                 backoff_base=0.5, backoff_cap=8.0, pool_size=8):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, on_retry=None, retry_statuses=RETRY_STATUS_CODES, retry_error=None, **kwargs):
+        """Send with retries; `on_retry(attempt)` is called before each retry.
+
+        For requests that must not be repeated once the server may have
+        acted on them, narrow `retry_statuses` and pass `retry_error`, a
+        predicate picking the connection errors that are safe to retry.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= self.max_retries or (retry_error is not None and not retry_error(e)):
+                    raise
+            else:
+                if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                retry_after = self._retry_after(response)
+                response.close()
+                if retry_after is not None:
+                    attempt += 1
+                    if on_retry is not None:
+                        on_retry(attempt)
+                    time.sleep(min(retry_after, self.backoff_cap))
+                    continue
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            if on_retry is not None:
+                on_retry(attempt)
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def backoff_delay(self, attempt):
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)].
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            return None
+
+    def close(self):
+        self.session.close()
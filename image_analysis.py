@@ -0,0 +1,82 @@
+import base64
+
+from analysis_cache import AnalysisCache
+from image_preprocess import preprocess, DEFAULT_MAX_EDGE, DEFAULT_QUALITY
+from single_flight import SingleFlight
+
+# Shared by every analyzer in the process, so a double-click, the batch
+# dialog and a second window all ride the same in-flight request.
+shared_flight = SingleFlight()
+
+
+class ImageAnalyzer:
+    """Cache -> preprocess -> Gemini pipeline shared by the interactive and batch paths.
+
+    Errors (unreadable image, HTTP failures, blocked or incomplete
+    answers) propagate to the caller and are never cached.
+    Concurrent requests for the same image are coalesced into one call;
+    setting `cancel_event` stops waiting on a call another caller leads.
+    """
+
+    def __init__(self, client, cache, prompt, max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY,
+                 stream=False, flight=None):
+        self.client = client
+        self.cache = cache
+        self.prompt = prompt
+        self.max_edge = max_edge
+        self.quality = quality
+        self.stream = stream
+        self.flight = flight or shared_flight
+
+    def analyze(self, image_path, on_partial=None, on_prepared=None, rate_limiter=None, stream=None,
+                cancel_event=None):
+        with open(image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+
+        cache_key = AnalysisCache.make_key(image_bytes, self.prompt, self.client.api_url)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        stream = self.stream if stream is None else stream
+        return self.flight.run(
+            cache_key,
+            lambda publish: self._fetch(image_path, cache_key, publish, on_prepared, rate_limiter, stream),
+            on_partial=on_partial, cancel_event=cancel_event)
+
+    def _fetch(self, image_path, cache_key, publish, on_prepared, rate_limiter, stream):
+        # A flight that just finished may have filled the cache after our lookup.
+        cached = self.cache.get(cache_key, record_stats=False)
+        if cached is not None:
+            return cached
+
+        prepared = preprocess(image_path, self.max_edge, self.quality)
+        if on_prepared is not None:
+            on_prepared(prepared)
+        image_data = base64.b64encode(prepared.data).decode('utf-8')
+
+        payload = {
+            "contents": [{
+                "parts": [
+                    {"text": self.prompt},
+                    {"inline_data": {"mime_type": prepared.mime_type, "data": image_data}}
+                ]
+            }]
+        }
+
+        # Only real network calls count against the quota; cache hits return above.
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        # Both paths raise IncompleteResponse for a blocked, cut-off or empty
+        # answer, so only complete text reaches the cache.
+        if stream:
+            chunks = []
+            for chunk in self.client.stream_generate_content(payload):
+                chunks.append(chunk)
+                publish(chunk)
+            text = "".join(chunks)
+        else:
+            text = self.client.generate_text(payload)
+        self.cache.put(cache_key, text)
+        return text
@@ -0,0 +1,105 @@
+import io
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageOps
+
+DEFAULT_MAX_EDGE = 1568
+DEFAULT_QUALITY = 85
+
+
+class PreparedImage(namedtuple("PreparedImage", "data mime_type original_bytes width height")):
+    __slots__ = ()
+
+    @property
+    def bytes_saved(self):
+        return self.original_bytes - len(self.data)
+
+
+def preprocess_image(image_path, max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY):
+    """Detect the real type, drop EXIF, apply orientation, downscale and re-encode."""
+    with open(image_path, "rb") as image_file:
+        raw = image_file.read()
+
+    image = Image.open(io.BytesIO(raw))
+    source_mime = Image.MIME.get(image.format, "application/octet-stream")
+    has_exif = bool(image.getexif())
+    original_size = image.size
+    # JPEG can decode straight at a reduced scale, which avoids materialising
+    # every pixel of a large phone photo.
+    image.draft("RGB", (max_edge, max_edge))
+    image = ImageOps.exif_transpose(image)
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    output = io.BytesIO()
+    if has_alpha:
+        image.save(output, format="PNG", optimize=True)
+        mime_type = "image/png"
+    else:
+        image.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+        mime_type = "image/jpeg"
+    data = output.getvalue()
+
+    untouched = not has_exif and image.size == original_size
+    if untouched and len(data) >= len(raw) and source_mime in ("image/jpeg", "image/png", "image/webp"):
+        data, mime_type = raw, source_mime
+
+    return PreparedImage(data, mime_type, len(raw), image.size[0], image.size[1])
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(max_workers=2):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" avoids forking a process that is running Qt threads.
+            _pool = ProcessPoolExecutor(max_workers=max_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def submit_preprocess(image_path, max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY):
+    pool = get_pool()
+    try:
+        return pool.submit(preprocess_image, image_path, max_edge, quality)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory while decoding a huge image)
+        # and the pool refuses all further work; replace it and retry once.
+        _discard_pool(pool)
+        return get_pool().submit(preprocess_image, image_path, max_edge, quality)
+
+
+def preprocess(image_path, max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY):
+    """Run preprocess_image in the pool and wait for it.
+
+    A job lost because a worker died while it was queued or running is
+    submitted once more, to a fresh pool.
+    """
+    try:
+        return submit_preprocess(image_path, max_edge, quality).result()
+    except BrokenProcessPool:
+        return submit_preprocess(image_path, max_edge, quality).result()
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
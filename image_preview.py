@@ -0,0 +1,72 @@
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+
+class _PreviewTask(QRunnable):
+    def __init__(self, loader, path, key, size):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+        self.key = key
+        self.size = size
+
+    def run(self):
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            # Decoders that support it (notably JPEG) decode straight at this
+            # size instead of materialising the full-resolution image.
+            reader.setScaledSize(original.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            self.loader._failed.emit(self.path, reader.errorString())
+        else:
+            self.loader._decoded.emit(self.path, self.key, image)
+
+
+class PreviewLoader(QObject):
+    """Decode size-bounded image previews on a background pool.
+
+    Results arrive through `preview_ready(path, pixmap)`; recently shown
+    files are served from a small in-memory thumbnail cache.
+    """
+    preview_ready = pyqtSignal(str, QPixmap)
+    preview_failed = pyqtSignal(str, str)
+    _decoded = pyqtSignal(str, object, QImage)
+    _failed = pyqtSignal(str, str)
+
+    def __init__(self, size=QSize(400, 400), cache_entries=16, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._decoded.connect(self._on_decoded)
+        self._failed.connect(self.preview_failed)
+
+    def load(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            self.preview_failed.emit(path, str(e))
+            return
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            self._cache.move_to_end(key)
+            self.preview_ready.emit(path, pixmap)
+            return
+        self._pool.start(_PreviewTask(self, path, key, self.size))
+
+    def _on_decoded(self, path, key, image):
+        # QPixmap must be created on the GUI thread.
+        pixmap = QPixmap.fromImage(image)
+        self._cache[key] = pixmap
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        self.preview_ready.emit(path, pixmap)
@@ -0,0 +1,124 @@
+import sqlite3
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRunnable, QThreadPool, pyqtSignal
+
+from sef_core import journal_entry_label
+from sef_storage import connect
+
+
+class _SearchTask(QRunnable):
+    def __init__(self, model, generation, query, since):
+        super().__init__()
+        self.model = model
+        self.generation = generation
+        self.query = query
+        self.since = since
+
+    def run(self):
+        try:
+            rows = self.model._search(self.query, self.since)
+        except sqlite3.Error as e:
+            print(f"Journal search failed: {e}")
+            rows = []
+        self.model._searched.emit(self.generation, rows)
+
+
+class JournalListModel(QAbstractListModel):
+    """Newest-first journal list that pages older entries in from the store.
+
+    Views call `fetchMore` as the user scrolls towards the end; new entries
+    are inserted at the top without resetting the model. `set_filter` swaps
+    the rows for ranked full-text search results, which are fetched on a
+    background thread; results overtaken by a newer search are dropped.
+    Rows are headers only (id, date, title, length); bodies stay in the
+    store until opened.
+    """
+    EntryIdRole = Qt.ItemDataRole.UserRole
+    _searched = pyqtSignal(int, object)
+
+    def __init__(self, store, page_size=200, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self._rows = []
+        self._exhausted = False
+        self.query = ""
+        self.since = None
+        self._generation = 0
+        # One thread with its own connection, so searches run one at a time
+        # and never share a connection with the GUI thread.
+        self._search_pool = QThreadPool(self)
+        self._search_pool.setMaxThreadCount(1)
+        self._search_conn = None
+        self._searched.connect(self._on_searched)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry_id, date, title, _ = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return journal_entry_label(date, title)
+        if role == self.EntryIdRole:
+            return entry_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        cursor = None
+        if self._rows:
+            entry_id, date, _, _ = self._rows[-1]
+            cursor = (date, entry_id)
+        page = self.store.load_journal_page(before=cursor, limit=self.page_size, since=self.since)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if page:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+    def set_filter(self, query, since=None):
+        self.query = query.strip()
+        self.since = since
+        self._generation += 1
+        if self.query:
+            # The current rows stay up until the results arrive.
+            self._exhausted = True
+            self._search_pool.clear()
+            self._search_pool.start(_SearchTask(self, self._generation, self.query, since))
+        else:
+            self.beginResetModel()
+            self._rows = []
+            self._exhausted = False
+            self.endResetModel()
+
+    def _search(self, query, since):
+        # Runs on the search thread.
+        if self._search_conn is None:
+            self._search_conn = connect(self.store.path)
+        return self.store.search_journal(query, start=since, conn=self._search_conn)
+
+    def _on_searched(self, generation, rows):
+        if generation != self._generation:
+            return
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def add_entry(self, entry_id, date, title, length):
+        if self.query:
+            # Search results are a snapshot; the entry shows once the search is cleared.
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, (entry_id, date, title, length))
+        self.endInsertRows()
+
+    def entry(self, row):
+        return self._rows[row]
@@ -0,0 +1,26 @@
+from PyQt6.QtWidgets import QTabWidget, QWidget
+
+
+class LazyTabWidget(QTabWidget):
+    """QTabWidget whose pages can be built the first time they are shown.
+
+    `add_lazy_tab(factory, label)` adds an empty page; when that tab first
+    becomes current, `factory(page)` is called to fill it in. Tabs the user
+    never opens cost one empty QWidget.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._factories = {}
+        self.currentChanged.connect(self.ensure_built)
+
+    def add_lazy_tab(self, factory, label):
+        page = QWidget()
+        self._factories[page] = factory
+        return self.addTab(page, label)
+
+    def ensure_built(self, index):
+        """Build the tab at `index` now if it has not been built yet."""
+        factory = self._factories.pop(self.widget(index), None)
+        if factory is not None:
+            factory(self.widget(index))
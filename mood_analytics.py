@@ -0,0 +1,186 @@
+from collections import namedtuple
+
+import numpy as np
+
+from sef_core import MOOD_LEVELS
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+NEUTRAL = MOOD_LEVELS.index("Neutral")
+
+# Per-day series are dense over `days` (every calendar day from the first
+# entry to the last) and NaN where a window holds no entries.
+MoodStats = namedtuple("MoodStats", [
+    "days", "daily_mean", "rolling_7", "rolling_30", "volatility_30",
+    "weekday_means", "hour_means",
+    "current_streak", "longest_streak", "low_streak",
+    "drop_days", "drop_sizes",
+])
+
+
+def _runs(mask):
+    """(starts, lengths) of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    return starts, np.flatnonzero(edges == -1) - starts
+
+
+class MoodAnalytics:
+    """Rolling averages, seasonality, volatility, streaks and sudden drops.
+
+    Keeps per-day sum/count/sum-of-squares accumulators plus weekday and
+    hour totals, updated in O(1) as the MoodStore reports new entries.
+    `stats()` derives every series from those accumulators with a few
+    cumulative sums and caches the result until the next entry arrives.
+    """
+
+    def __init__(self, mood_store, drop_window=7, drop_threshold=1.0, drop_min_entries=3):
+        self.mood_store = mood_store
+        self.drop_window = drop_window
+        self.drop_threshold = drop_threshold
+        self.drop_min_entries = drop_min_entries
+        self._reset()
+        self._load()
+        mood_store.subscribe(self._on_add)
+
+    def _reset(self):
+        self.origin = 0
+        self.span = 0
+        self._sums = np.zeros(0)
+        self._counts = np.zeros(0)
+        self._squares = np.zeros(0)
+        self._weekday = np.zeros((2, 7))
+        self._hour = np.zeros((2, 24))
+        self._stats = None
+
+    def _load(self):
+        days = np.frombuffer(self.mood_store.days, dtype=np.intc).astype(np.int64)
+        if not len(days):
+            return
+        codes = np.frombuffer(self.mood_store.codes, dtype=np.int8).astype(float)
+        hours = np.frombuffer(self.mood_store.hours, dtype=np.int8)
+        self.origin = int(days.min())
+        self.span = int(days.max()) - self.origin + 1
+        offsets = days - self.origin
+        self._sums = np.bincount(offsets, weights=codes, minlength=self.span)
+        self._counts = np.bincount(offsets, minlength=self.span).astype(float)
+        self._squares = np.bincount(offsets, weights=codes * codes, minlength=self.span)
+        weekdays = (days - 1) % 7
+        self._weekday = np.array([np.bincount(weekdays, weights=codes, minlength=7),
+                                  np.bincount(weekdays, minlength=7)], dtype=float)
+        known = hours >= 0
+        self._hour = np.array([np.bincount(hours[known], weights=codes[known], minlength=24),
+                               np.bincount(hours[known], minlength=24)], dtype=float)
+
+    def _on_add(self, day, code=None, hour=-1):
+        self._stats = None
+        if day is None:
+            self._reset()
+            return
+        if self.span == 0:
+            self.origin = day
+        if day < self.origin:
+            # Back-dated before the first entry: shift everything right.
+            shift = self.origin - day
+            self._sums, self._counts, self._squares = (
+                np.concatenate((np.zeros(shift), a)) for a in (self._sums, self._counts, self._squares))
+            self.origin = day
+            self.span += shift
+        index = day - self.origin
+        if index >= len(self._sums):
+            # Grow with slack so daily appends do not reallocate every time.
+            extra = max(index + 1 - len(self._sums), 64)
+            self._sums, self._counts, self._squares = (
+                np.concatenate((a, np.zeros(extra))) for a in (self._sums, self._counts, self._squares))
+        self.span = max(self.span, index + 1)
+        self._sums[index] += code
+        self._counts[index] += 1
+        self._squares[index] += code * code
+        self._weekday[:, (day - 1) % 7] += (code, 1)
+        if hour >= 0:
+            self._hour[:, hour] += (code, 1)
+
+    def stats(self):
+        if self._stats is None:
+            self._stats = self._compute()
+        return self._stats
+
+    def _compute(self):
+        n = self.span
+        sums, counts, squares = self._sums[:n], self._counts[:n], self._squares[:n]
+        cum_sums = np.concatenate(([0.0], np.cumsum(sums)))
+        cum_counts = np.concatenate(([0.0], np.cumsum(counts)))
+        cum_squares = np.concatenate(([0.0], np.cumsum(squares)))
+        ends = np.arange(1, n + 1)
+
+        def window(width):
+            starts = np.maximum(ends - width, 0)
+            return (cum_sums[ends] - cum_sums[starts], cum_counts[ends] - cum_counts[starts],
+                    cum_squares[ends] - cum_squares[starts])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            daily_mean = sums / counts
+            rolling_7 = np.divide(*window(7)[:2])
+            total, count, square = window(30)
+            rolling_30 = total / count
+            variance = np.where(count > 1, square / count - rolling_30 ** 2, np.nan)
+            volatility_30 = np.sqrt(np.maximum(variance, 0))
+            weekday_means = self._weekday[0] / self._weekday[1]
+            hour_means = self._hour[0] / self._hour[1]
+
+        logged = counts > 0
+        current_streak = longest_streak = low_streak = 0
+        if n:
+            starts, lengths = _runs(logged)
+            longest_streak = int(lengths.max())
+            # The data always ends on a logged day, so the last run is current.
+            current_streak = int(lengths[-1])
+            low_starts, low_lengths = _runs(logged & (daily_mean < NEUTRAL))
+            if len(low_starts) and low_starts[-1] + low_lengths[-1] == n:
+                low_streak = int(low_lengths[-1])
+
+        drop_days, drop_sizes = self._drops(cum_sums, cum_counts, n)
+        return MoodStats(np.arange(self.origin, self.origin + n), daily_mean, rolling_7, rolling_30,
+                         volatility_30, weekday_means, hour_means,
+                         current_streak, longest_streak, low_streak, drop_days, drop_sizes)
+
+    def _drops(self, cum_sums, cum_counts, n):
+        """Days where the mean of the next `drop_window` days falls sharply
+        below the mean of the previous ones; one day per episode."""
+        w = self.drop_window
+        if n < 2 * w:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        split = np.arange(w, n - w + 1)
+        before_count = cum_counts[split] - cum_counts[split - w]
+        after_count = cum_counts[split + w] - cum_counts[split]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drop = ((cum_sums[split] - cum_sums[split - w]) / before_count
+                    - (cum_sums[split + w] - cum_sums[split]) / after_count)
+        candidate = ((drop >= self.drop_threshold) & (before_count >= self.drop_min_entries)
+                     & (after_count >= self.drop_min_entries))
+        starts, lengths = _runs(candidate)
+        if not len(starts):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        # The split with the largest drop within each run of candidate days.
+        peaks = np.array([start + np.argmax(drop[start:start + length])
+                          for start, length in zip(starts, lengths)])
+        return self.origin + split[peaks], drop[peaks]
+
+
+def mood_summary(stats):
+    """One-line description of the current stats for the Mood Tracker tab."""
+    if not len(stats.days):
+        return "No mood entries yet."
+    parts = [f"Streak: {stats.current_streak} day(s) (best {stats.longest_streak})"]
+    if stats.low_streak:
+        parts.append(f"{stats.low_streak} low day(s) in a row")
+    volatility = stats.volatility_30[-1]
+    if not np.isnan(volatility):
+        parts.append(f"30-day volatility: {volatility:.2f}")
+    if np.count_nonzero(~np.isnan(stats.weekday_means)) > 1:
+        parts.append(f"Best day: {WEEKDAYS[int(np.nanargmax(stats.weekday_means))]}, "
+                     f"hardest: {WEEKDAYS[int(np.nanargmin(stats.weekday_means))]}")
+    if np.count_nonzero(~np.isnan(stats.hour_means)) > 1:
+        parts.append(f"Lowest hour: {int(np.nanargmin(stats.hour_means)):02d}:00")
+    if len(stats.drop_days):
+        parts.append(f"{len(stats.drop_days)} sudden drop(s)")
+    return " · ".join(parts)
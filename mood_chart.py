@@ -0,0 +1,301 @@
+import datetime
+import traceback
+from collections import namedtuple
+
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QImage, QPainter, QColor
+from PyQt6.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal
+
+from sef_core import MOOD_LEVELS
+from mood_rollups import MoodRollups
+
+# Horizontal pixels per plotted bucket when choosing a resolution.
+PIXELS_PER_POINT = 6
+TITLES = {
+    "day": "Mood History (daily)",
+    "week": "Mood History (weekly averages)",
+    "month": "Mood History (monthly averages)",
+}
+
+# Everything one frame needs, snapshotted on the GUI thread so the renderer
+# never touches the live stores. x values are day ordinals; `line` is
+# (xs, means), `band` (xs, mins, maxes) and `overlays` (xs, avg7, avg30,
+# drop_xs, drop_ys) or None.
+RenderRequest = namedtuple("RenderRequest", "width height ratio xlim title line band overlays")
+# Where the axes landed in the frame, in widget pixels, for mouse mapping.
+FrameGeometry = namedtuple("FrameGeometry", "left width")
+
+
+class ChartRenderer(QObject):
+    """Owns the Figure and renders it with Agg on the chart's worker thread.
+
+    matplotlib is imported on first render, on that thread, so it never
+    adds to application startup. The data artists are animated: while size,
+    view and title stay the same, a render restores the cached background
+    and blits just those. Every render ends with `frame_ready` or, if
+    drawing raised, `render_failed`.
+    """
+    frame_ready = pyqtSignal(QImage, object)
+    render_failed = pyqtSignal()
+
+    def __init__(self, with_overlays):
+        super().__init__()
+        self.with_overlays = with_overlays
+        self.figure = None
+        self.background = None
+        self.background_key = None
+
+    def _setup(self):
+        from matplotlib.figure import Figure
+        from matplotlib.dates import date2num
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        epoch = datetime.date(1970, 1, 1)
+        # Day ordinal -> matplotlib date number, whatever epoch matplotlib is using.
+        self.ordinal_offset = date2num(epoch) - epoch.toordinal()
+        self.figure = Figure(dpi=100)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        (self.line,) = self.ax.plot([], [], 'o-', markersize=4, label='Mood')
+        self.band = self.ax.fill_between([], [], [], alpha=0.2, label='Range')
+        if self.with_overlays:
+            (self.average_7,) = self.ax.plot([], [], '-', linewidth=2, label='7-day average')
+            (self.average_30,) = self.ax.plot([], [], '--', linewidth=2, label='30-day average')
+            (self.drops,) = self.ax.plot([], [], 'v', color='red', markersize=10, label='Sudden drop')
+        self.ax.legend(loc='lower left', fontsize='small', ncol=5)
+        self.ax.xaxis_date()
+        self.ax.set_ylim(-0.5, len(MOOD_LEVELS) - 0.5)
+        self.ax.set_yticks(range(len(MOOD_LEVELS)))
+        self.ax.set_yticklabels(MOOD_LEVELS)
+        self.ax.set_xlabel('Date')
+        self.ax.set_ylabel('Mood')
+        self.ax.tick_params(axis='x', labelrotation=45)
+        self.ax.set_autoscale_on(False)
+        for artist in self._data_artists():
+            artist.set_animated(True)
+
+    def _data_artists(self):
+        artists = [self.band, self.line]
+        if self.with_overlays:
+            artists += [self.average_7, self.average_30, self.drops]
+        return artists
+
+    def render(self, request):
+        try:
+            image, geometry = self._draw(request)
+        except Exception:
+            traceback.print_exc()
+            # The figure may be half-updated; start the next render from scratch.
+            self.background_key = None
+            self.render_failed.emit()
+        else:
+            self.frame_ready.emit(image, geometry)
+
+    def _draw(self, request):
+        if self.figure is None:
+            self._setup()
+        key = (request.width, request.height, request.ratio, tuple(request.xlim), request.title)
+        if key != self.background_key:
+            # Render at device resolution; dpi scales with it so text keeps its size.
+            self.figure.set_dpi(100 * request.ratio)
+            self.figure.set_size_inches(request.width / 100, request.height / 100)
+            self.ax.set_xlim(*self._dates(request.xlim))
+            self.ax.set_title(request.title)
+            self.figure.tight_layout()
+            # Animated artists are left out of a full draw.
+            self.canvas.draw()
+            self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+            self.background_key = key
+        else:
+            self.canvas.restore_region(self.background)
+
+        xs, means = request.line
+        self.line.set_data(self._dates(xs), means)
+        xs, mins, maxes = request.band
+        self.band.remove()
+        self.band = self.ax.fill_between(self._dates(xs), mins, maxes, alpha=0.2, color=self.line.get_color(),
+                                         label='Range', animated=True)
+        if request.overlays is not None:
+            xs, average_7, average_30, drop_xs, drop_ys = request.overlays
+            self.average_7.set_data(self._dates(xs), average_7)
+            self.average_30.set_data(self._dates(xs), average_30)
+            self.drops.set_data(self._dates(drop_xs), drop_ys)
+        for artist in self._data_artists():
+            self.ax.draw_artist(artist)
+
+        width, height = self.canvas.get_width_height(physical=True)
+        image = QImage(bytes(self.canvas.buffer_rgba()), width, height, 4 * width,
+                       QImage.Format.Format_RGBA8888)
+        image.setDevicePixelRatio(request.ratio)
+        bbox = self.ax.bbox
+        return image, FrameGeometry(bbox.x0 / request.ratio, bbox.width / request.ratio)
+
+    def _dates(self, ordinals):
+        return np.asarray(ordinals, dtype=float) + self.ordinal_offset
+
+
+class MoodChart(QWidget):
+    """Mood history plot rendered off the GUI thread.
+
+    Call `mark_dirty()` whenever the history changes. The GUI thread only
+    snapshots the buckets in view; a ChartRenderer on a worker thread draws
+    them with Agg and hands back a QImage that is painted as-is. At most one
+    render is in flight and requests made meanwhile collapse into a single
+    render of the latest state.
+    The line shows daily, weekly or monthly means with a min-max band from
+    MoodRollups, picked for the visible range on every zoom (mouse wheel)
+    or pan (drag), so drawing cost follows the pixel width rather than the
+    history. Double-click shows the whole history again.
+    With a MoodAnalytics, 7/30-day averages and sudden drops are overlaid.
+    """
+    render_requested = pyqtSignal(object)
+
+    def __init__(self, mood_store, analytics=None, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(300, 250)
+        self.setToolTip("Scroll to zoom, drag to pan, double-click to show everything")
+        self.mood_store = mood_store
+        self.rollups = MoodRollups(mood_store)
+        self.analytics = analytics
+        self.level = None
+        self.xlim = None
+        self.user_view = False
+        self.dirty = False
+        self.frame = None
+        self.frame_geometry = None
+        self._busy = False
+        self._pending = False
+        self._drag = None
+
+        self._thread = QThread()
+        self._renderer = ChartRenderer(analytics is not None)
+        self._renderer.moveToThread(self._thread)
+        self.render_requested.connect(self._renderer.render)
+        self._renderer.frame_ready.connect(self._on_frame)
+        self._renderer.render_failed.connect(self._on_render_failed)
+        self._thread.start()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def shutdown(self):
+        self._thread.quit()
+        self._thread.wait()
+
+    def mark_dirty(self):
+        self.dirty = True
+        self._refresh_timer.start(0)
+
+    def refresh(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.request_render()
+
+    def request_render(self):
+        if self._busy:
+            self._pending = True
+            return
+        request = self._snapshot()
+        self._busy = True
+        self._pending = False
+        self.render_requested.emit(request)
+
+    def _on_frame(self, image, geometry):
+        self.frame = image
+        self.frame_geometry = geometry
+        self._busy = False
+        self.update()
+        if self._pending:
+            self.request_render()
+
+    def _on_render_failed(self):
+        # Keep showing the last good frame; later changes render again.
+        self._busy = False
+        if self._pending:
+            self.request_render()
+
+    def _snapshot(self):
+        span = self.rollups.span()
+        if not self.user_view or self.xlim is None:
+            if span is None:
+                today = datetime.date.today().toordinal()
+                self.xlim = (today - 30, today + 1)
+            else:
+                low, high = span
+                pad = max(1.0, (high - low) * 0.05)
+                self.xlim = (low - pad, high + pad)
+
+        low, high = self.xlim
+        start, end = int(np.floor(low)), int(np.ceil(high))
+        axes_width = self.frame_geometry.width if self.frame_geometry else self.width() * 0.8
+        max_points = max(axes_width, 1) / PIXELS_PER_POINT
+        self.level = self.rollups.pick_level(end - start, max_points)
+        keys, means, mins, maxes = self.rollups.window(self.level, start, end)
+
+        overlays = None
+        if self.analytics is not None:
+            overlays = self._overlays(self.analytics.stats(), start, end, max_points)
+        return RenderRequest(self.width(), self.height(), self.devicePixelRatioF(), self.xlim,
+                             TITLES[self.level], (keys, means), (keys, mins, maxes), overlays)
+
+    def _overlays(self, stats, start, end, max_points):
+        if not len(stats.days):
+            return [], [], [], [], []
+        first = stats.days[0]
+        low = int(np.clip(start - first - 1, 0, len(stats.days)))
+        high = int(np.clip(end - first + 2, 0, len(stats.days)))
+        step = max(1, int((high - low) / max_points))
+        # Markers sit on the 7-day average where the drop begins.
+        return (stats.days[low:high:step], stats.rolling_7[low:high:step],
+                stats.rolling_30[low:high:step], stats.drop_days,
+                stats.rolling_7[stats.drop_days - first])
+
+    def _set_view(self, low, high):
+        # Once the user has zoomed or panned, new entries no longer refit the view.
+        self.user_view = True
+        self.xlim = (low, high)
+        self.request_render()
+
+    def _pixels_to_days(self, pixels):
+        low, high = self.xlim
+        return pixels * (high - low) / max(self.frame_geometry.width, 1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        if self.frame is not None:
+            # Stretched briefly while a frame for a new size is rendering.
+            painter.drawImage(self.rect(), self.frame)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_render()
+
+    def wheelEvent(self, event):
+        if self.frame_geometry is None or self.xlim is None:
+            return
+        low, high = self.xlim
+        x = low + self._pixels_to_days(event.position().x() - self.frame_geometry.left)
+        scale = 0.8 if event.angleDelta().y() > 0 else 1.25
+        self._set_view(x - (x - low) * scale, x + (high - x) * scale)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and self.frame_geometry is not None:
+            self._drag = (event.position().x(), self.xlim)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            return
+        start_x, (low, high) = self._drag
+        shift = self._pixels_to_days(start_x - event.position().x())
+        self._set_view(low + shift, high + shift)
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.user_view = False
+        self.request_render()
@@ -0,0 +1,111 @@
+import datetime
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Resolutions from finest to coarsest, with their approximate length in days.
+LEVELS = [("day", 1), ("week", 7), ("month", 30.44)]
+
+
+def _bucket_keys(level, days):
+    """First day (ordinal) of the bucket holding each day, for an int64 array."""
+    if level == "day":
+        return days
+    if level == "week":
+        return days - (days - 1) % 7
+    months = (days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+    return months.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+
+
+class _Rollup:
+    """Sorted buckets of one resolution: start day, count, sum, min and max."""
+
+    def __init__(self):
+        self.keys = array('i')
+        self.counts = array('I')
+        self.sums = array('d')
+        self.mins = array('b')
+        self.maxes = array('b')
+
+    def add(self, key, code):
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            self.counts[index] += 1
+            self.sums[index] += code
+            self.mins[index] = min(self.mins[index], code)
+            self.maxes[index] = max(self.maxes[index], code)
+        else:
+            self.keys.insert(index, key)
+            self.counts.insert(index, 1)
+            self.sums.insert(index, code)
+            self.mins.insert(index, code)
+            self.maxes.insert(index, code)
+
+    def load(self, keys, codes):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        mins = np.full(len(unique), 127, dtype=np.int8)
+        maxes = np.full(len(unique), -128, dtype=np.int8)
+        np.minimum.at(mins, inverse, codes)
+        np.maximum.at(maxes, inverse, codes)
+        self.keys = array('i', unique.astype(np.intc).tobytes())
+        self.counts = array('I', np.bincount(inverse).astype(np.uintc).tobytes())
+        self.sums = array('d', np.bincount(inverse, weights=codes).tobytes())
+        self.mins = array('b', mins.tobytes())
+        self.maxes = array('b', maxes.tobytes())
+
+
+class MoodRollups:
+    """Daily, weekly and monthly count/mean/min/max of a MoodStore.
+
+    Built once from the store's columns and then kept current one entry at
+    a time through `MoodStore.subscribe`, so the chart never aggregates the
+    raw history while zooming. `window` returns only the buckets in a range.
+    """
+
+    def __init__(self, mood_store):
+        self.mood_store = mood_store
+        self.levels = {level: _Rollup() for level, _ in LEVELS}
+        days = np.frombuffer(mood_store.days, dtype=np.intc).astype(np.int64)
+        if len(days):
+            codes = np.frombuffer(mood_store.codes, dtype=np.int8)
+            for level, rollup in self.levels.items():
+                rollup.load(_bucket_keys(level, days), codes)
+        mood_store.subscribe(self._on_add)
+
+    def _on_add(self, day, code=None, hour=-1):
+        if day is None:
+            self.levels = {level: _Rollup() for level, _ in LEVELS}
+            return
+        date = datetime.date.fromordinal(day)
+        self.levels["day"].add(day, code)
+        self.levels["week"].add(day - date.weekday(), code)
+        self.levels["month"].add(date.replace(day=1).toordinal(), code)
+
+    @staticmethod
+    def pick_level(visible_days, max_points):
+        """Finest resolution showing at most `max_points` buckets over `visible_days`."""
+        for level, length in LEVELS:
+            if visible_days / length <= max_points:
+                return level
+        return LEVELS[-1][0]
+
+    def window(self, level, start, end):
+        """(keys, means, mins, maxes) arrays for buckets from `start` to `end`
+        (day ordinals), plus one bucket either side so lines reach the edges."""
+        rollup = self.levels[level]
+        low = max(bisect_left(rollup.keys, start) - 1, 0)
+        high = min(bisect_left(rollup.keys, end) + 1, len(rollup.keys))
+        keys = np.frombuffer(rollup.keys, dtype=np.intc)[low:high].copy()
+        counts = np.frombuffer(rollup.counts, dtype=np.uintc)[low:high]
+        means = np.frombuffer(rollup.sums, dtype=np.float64)[low:high] / counts
+        mins = np.frombuffer(rollup.mins, dtype=np.int8)[low:high].astype(float)
+        maxes = np.frombuffer(rollup.maxes, dtype=np.int8)[low:high].astype(float)
+        return keys, means, mins, maxes
+
+    def span(self):
+        """(first, last) day ordinals with entries, or None when empty."""
+        keys = self.levels["day"].keys
+        return (keys[0], keys[-1]) if keys else None
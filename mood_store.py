@@ -0,0 +1,67 @@
+import datetime
+from array import array
+from bisect import bisect_right
+
+from sef_core import MOOD_LEVELS, mood_score
+
+
+class MoodStore:
+    """Column-oriented mood history, kept sorted by date.
+
+    Dates are day ordinals in an int32 array and moods are their MOOD_LEVELS
+    index in an int8 array, so charting and analytics can read whole columns
+    without touching per-entry Python objects. Notes live in a side table
+    keyed by entry id, and only non-empty notes are stored. The hour an
+    entry was logged is kept when known, -1 otherwise. Listeners added with
+    `subscribe` are called with (day, code, hour) for every new entry and
+    with None when the store is cleared.
+    """
+
+    def __init__(self):
+        self.days = array('i')
+        self.codes = array('b')
+        self.ids = array('I')
+        self.hours = array('b')
+        self.notes = {}
+        self._next_id = 1
+        self._listeners = []
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def add(self, date, mood, notes="", entry_id=None, hour=-1):
+        if entry_id is None:
+            entry_id = self._next_id
+        self._next_id = max(self._next_id, entry_id + 1)
+        day = date.toordinal()
+        # bisect_right keeps same-day entries in insertion order.
+        index = bisect_right(self.days, day)
+        code = mood_score(mood)
+        self.days.insert(index, day)
+        self.codes.insert(index, code)
+        self.ids.insert(index, entry_id)
+        self.hours.insert(index, hour)
+        if notes:
+            self.notes[entry_id] = notes
+        for listener in self._listeners:
+            listener(day, code, hour)
+        return entry_id
+
+    def __len__(self):
+        return len(self.days)
+
+    def __iter__(self):
+        for day, code, entry_id in zip(self.days, self.codes, self.ids):
+            yield datetime.date.fromordinal(day), MOOD_LEVELS[code], self.notes.get(entry_id, "")
+
+    def columns(self):
+        return self.days, self.codes
+
+    def clear(self):
+        del self.days[:]
+        del self.codes[:]
+        del self.ids[:]
+        del self.hours[:]
+        self.notes.clear()
+        for listener in self._listeners:
+            listener(None)
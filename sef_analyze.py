@@ -0,0 +1,119 @@
+"""Headless image analysis: python sef_analyze.py images/*.jpg --json"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_analysis import TokenBucket, collect_images
+from image_preprocess import DEFAULT_MAX_EDGE, DEFAULT_QUALITY, shutdown_pool
+import sef_core
+
+
+def positive_float(text):
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {text!r}")
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {text}")
+    return value
+
+
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {text}")
+    return value
+
+
+def jpeg_quality(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    if not 1 <= value <= 100:
+        raise argparse.ArgumentTypeError(f"must be between 1 and 100, got {text}")
+    return value
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="sef-analyze",
+                                     description="Analyze images for signs of distress with Gemini.")
+    parser.add_argument("paths", nargs="+", help="image files, directories or glob patterns")
+    parser.add_argument("--json", action="store_true", help="print results as a JSON array")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY", ""),
+                        help="Gemini API key (default: $GEMINI_API_KEY)")
+    parser.add_argument("--api-url", default=sef_core.GEMINI_API_URL)
+    parser.add_argument("--prompt", default=sef_core.ANALYSIS_PROMPT)
+    parser.add_argument("--cache-dir", default=sef_core.ANALYSIS_CACHE_DIR)
+    parser.add_argument("--workers", type=positive_int, default=4)
+    parser.add_argument("--rpm", type=positive_float, default=60, help="maximum Gemini requests per minute")
+    parser.add_argument("--max-edge", type=positive_int, default=DEFAULT_MAX_EDGE)
+    parser.add_argument("--quality", type=jpeg_quality, default=DEFAULT_QUALITY, help="JPEG quality, 1-100")
+    return parser.parse_args(argv)
+
+
+def expand_paths(patterns):
+    # Shells without globbing (e.g. cmd.exe) pass patterns through literally.
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(matches)
+    return collect_images(paths)
+
+
+def analyze_all(analyzer, image_paths, workers, rpm):
+    limiter = TokenBucket(rpm)
+
+    def analyze_one(path):
+        start = time.perf_counter()
+        try:
+            result = analyzer.analyze(path, rate_limiter=limiter)
+            status = "done"
+        except Exception as e:
+            result = sef_core.format_analysis_error(e)
+            status = "error"
+        return {"path": path, "status": status, "latency": round(time.perf_counter() - start, 3),
+                "result": result}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyze_one, image_paths))
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    image_paths = expand_paths(args.paths)
+    if not image_paths:
+        print("sef-analyze: no PNG or JPEG images found", file=sys.stderr)
+        return 2
+
+    analyzer = sef_core.build_analyzer(args.api_key, args.api_url, args.cache_dir, args.prompt,
+                                       args.max_edge, args.quality)
+    try:
+        results = analyze_all(analyzer, image_paths, args.workers, args.rpm)
+    finally:
+        shutdown_pool()
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for item in results:
+            print(f"== {item['path']} ({item['status']}, {item['latency']:.2f}s) ==")
+            print(item["result"])
+            print()
+    flight_stats = analyzer.flight.stats()
+    cache_stats = analyzer.cache.stats()
+    print(f"sef-analyze: {len(results)} images, {cache_stats['hits']} cache hits, "
+          f"{flight_stats['coalesced']} duplicates coalesced", file=sys.stderr)
+    return 1 if any(item["status"] == "error" for item in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
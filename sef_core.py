@@ -0,0 +1,42 @@
+"""GUI-free core of the SEF support tool: image analysis, moods and journal.
+
+Nothing here imports PyQt6, matplotlib or twilio, so it can run on servers
+and from cron via sef_analyze.py.
+"""
+import os
+
+import requests
+
+from analysis_cache import AnalysisCache
+from gemini_client import GeminiClient
+from image_analysis import ImageAnalyzer
+from image_preprocess import DEFAULT_MAX_EDGE, DEFAULT_QUALITY
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro-latest:generateContent"
+ANALYSIS_PROMPT = "Analyze this image for signs of mental distress or unsafe conditions. Provide a detailed analysis and safety recommendations."
+
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".sef_mentalsupport")
+ANALYSIS_CACHE_DIR = os.path.join(APP_DATA_DIR, "analysis_cache")
+
+# Ordered from lowest to highest; the index is the mood's score.
+MOOD_LEVELS = ["Very Sad", "Sad", "Neutral", "Happy", "Very Happy"]
+
+
+def build_analyzer(api_key, api_url=GEMINI_API_URL, cache_dir=ANALYSIS_CACHE_DIR, prompt=ANALYSIS_PROMPT,
+                   max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY, stream=False):
+    return ImageAnalyzer(GeminiClient(api_key, api_url), AnalysisCache(cache_dir), prompt,
+                         max_edge, quality, stream=stream)
+
+
+def format_analysis_error(error):
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"Error: {str(error)}"
+    return f"Error: could not analyze image ({str(error)})"
+
+
+def mood_score(mood):
+    return MOOD_LEVELS.index(mood)
+
+
+def journal_entry_label(date, title):
+    return f"{date.strftime('%Y-%m-%d %H:%M')} - {title}"
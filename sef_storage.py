@@ -0,0 +1,297 @@
+import datetime
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sef_core import MOOD_LEVELS, mood_score
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS moods (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    mood INTEGER NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    logged_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS moods_day ON moods(day);
+
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_created_at ON journal(created_at);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    phone TEXT NOT NULL UNIQUE,
+    added_at REAL NOT NULL
+);
+"""
+
+# External-content FTS5 index over journal title/content, kept current by
+# triggers so every insert, update and delete is indexed incrementally.
+JOURNAL_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE journal_fts USING fts5(
+    title, content, content='journal', content_rowid='id', tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3 4'
+);
+CREATE TRIGGER journal_fts_insert AFTER INSERT ON journal BEGIN
+    INSERT INTO journal_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER journal_fts_delete AFTER DELETE ON journal BEGIN
+    INSERT INTO journal_fts(journal_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER journal_fts_update AFTER UPDATE ON journal BEGIN
+    INSERT INTO journal_fts(journal_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO journal_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+INSERT INTO journal_fts(journal_fts, rank) VALUES ('rank', 'bm25(5.0, 1.0)');
+INSERT INTO journal_fts(journal_fts) VALUES ('rebuild');
+"""
+
+# bm25 ranking costs time proportional to the number of matches (about
+# 10 ms for 2000 on 100k entries); broader queries are ordered newest first.
+SEARCH_RANK_LIMIT = 2000
+
+JOURNAL_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class LocalStore:
+    """SQLite persistence for moods, journal entries and emergency contacts.
+
+    Writes are queued and committed together by `flush()`, so a burst of
+    saves costs one transaction. Ids are assigned by SQLite, so several
+    windows or processes can share one database; a journal entry, whose id
+    the caller needs at once, is written straight away along with whatever
+    is queued. The journal is read a page at a time.
+    """
+
+    def __init__(self, path, batch_size=100, body_cache_entries=32):
+        self.path = path
+        self.batch_size = batch_size
+        self.body_cache_entries = body_cache_entries
+        self._bodies = OrderedDict()
+        self.conn = connect(path)
+        self.conn.executescript(SCHEMA)
+        self.has_fts = self._ensure_fts()
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def _ensure_fts(self):
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_fts'").fetchone()
+        if exists:
+            return True
+        try:
+            self.conn.executescript(f"BEGIN; {JOURNAL_FTS_SCHEMA} COMMIT;")
+            return True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE scans.
+            self.conn.rollback()
+            return False
+
+    def _queue(self, sql, params):
+        with self._lock:
+            self._pending.append((sql, params))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _write_now(self, sql, params):
+        """Commit the queue plus one more row; returns that row's id."""
+        with self._lock:
+            self._pending.append((sql, params))
+            return self._commit_pending()
+
+    def flush(self):
+        """Commit queued writes.
+
+        A transient error (database locked or busy, disk full) is raised and
+        the batch stays queued for the next flush. Rows the database rejects
+        outright are dropped with a warning rather than blocking every later
+        write.
+        """
+        with self._lock:
+            if self._pending:
+                self._commit_pending()
+
+    def _commit_pending(self):
+        """Commit the queue; returns the id of its last row, None if that row was dropped."""
+        try:
+            with self.conn:
+                for sql, params in self._pending:
+                    row_id = self.conn.execute(sql, params).lastrowid
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError:
+            row_id = self._commit_each()
+        self._pending = []
+        return row_id
+
+    def _commit_each(self):
+        with self.conn:
+            for sql, params in self._pending:
+                try:
+                    row_id = self.conn.execute(sql, params).lastrowid
+                except sqlite3.OperationalError:
+                    raise
+                except sqlite3.DatabaseError as e:
+                    row_id = None
+                    print(f"Dropped a write the database rejected: {e}")
+        return row_id
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    # Moods
+
+    def add_mood(self, date, mood, notes=""):
+        self._queue("INSERT INTO moods (day, mood, notes, logged_at) VALUES (?, ?, ?, ?)",
+                    (date.toordinal(), mood_score(mood), notes, time.time()))
+
+    def load_moods(self, since=None):
+        """(id, date, mood, notes, hour) for every mood, or those on or after
+        the date `since`, oldest first.
+
+        The hour is only known for moods logged on the day they describe;
+        it is -1 for back-dated and imported entries.
+        """
+        cutoff = since.toordinal() if since is not None else 0
+        rows = self.conn.execute("SELECT id, day, mood, notes, logged_at FROM moods WHERE day >= ? ORDER BY day, id",
+                                 (cutoff,))
+        for entry_id, day, mood, notes, logged_at in rows:
+            logged = datetime.datetime.fromtimestamp(logged_at)
+            hour = logged.hour if logged.toordinal() == day else -1
+            yield entry_id, datetime.date.fromordinal(day), MOOD_LEVELS[mood], notes, hour
+
+    # Journal
+
+    def add_journal_entry(self, date, title, content):
+        entry_id = self._write_now("INSERT INTO journal (created_at, title, content) VALUES (?, ?, ?)",
+                                   (date.strftime(JOURNAL_DATE_FORMAT), title, content))
+        if entry_id is None:
+            raise sqlite3.DatabaseError("journal entry was not saved")
+        self._remember_body(entry_id, content)
+        return entry_id
+
+    def load_journal_content(self, entry_id):
+        """Body of one entry; recently read bodies are served from an LRU."""
+        with self._lock:
+            if entry_id in self._bodies:
+                self._bodies.move_to_end(entry_id)
+                return self._bodies[entry_id]
+        self.flush()
+        row = self.conn.execute("SELECT content FROM journal WHERE id = ?", (entry_id,)).fetchone()
+        content = row[0] if row else ""
+        self._remember_body(entry_id, content)
+        return content
+
+    def _remember_body(self, entry_id, content):
+        with self._lock:
+            self._bodies[entry_id] = content
+            self._bodies.move_to_end(entry_id)
+            while len(self._bodies) > self.body_cache_entries:
+                self._bodies.popitem(last=False)
+
+    # Journal listings return (id, created_at, title, length) headers only;
+    # bodies are loaded on demand with load_journal_content.
+
+    def load_journal_page(self, before=None, limit=200, since=None):
+        """Up to `limit` headers older than the `before` (date, id) cursor, newest first."""
+        self.flush()
+        sql = "SELECT id, created_at, title, length(content) FROM journal WHERE 1"
+        params = []
+        if before is not None:
+            date, entry_id = before
+            sql += " AND (created_at, id) < (?, ?)"
+            params += [date.strftime(JOURNAL_DATE_FORMAT), entry_id]
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since.strftime(JOURNAL_DATE_FORMAT))
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return self._journal_headers(self.conn.execute(sql, params))
+
+    @staticmethod
+    def _journal_headers(rows):
+        return [(entry_id, datetime.datetime.strptime(created_at, JOURNAL_DATE_FORMAT), title, length)
+                for entry_id, created_at, title, length in rows]
+
+    def search_journal(self, query, start=None, end=None, limit=200, conn=None):
+        """Ranked matches for `query`, newest first among equal ranks.
+
+        Every word must match, and each word also matches as a prefix
+        ("anx" finds "anxiety"). `start`/`end` bound created_at (datetimes).
+        Queries matching more than SEARCH_RANK_LIMIT entries are not ranked.
+        Searches from another thread pass their own `conn`; journal entries
+        are never left queued, so it sees all of them.
+        """
+        if conn is None:
+            self.flush()
+            conn = self.conn
+        words = query.split()
+        if not words:
+            return []
+
+        if self.has_fts:
+            # One-letter prefixes would expand to most of the vocabulary and
+            # have no prefix index, so those match whole words only.
+            match = " ".join('"' + word.replace('"', '""') + ('"*' if len(word) > 1 else '"')
+                             for word in words)
+            (matches,) = conn.execute(
+                "SELECT count(*) FROM (SELECT 1 FROM journal_fts WHERE journal_fts MATCH ? LIMIT ?)",
+                (match, SEARCH_RANK_LIMIT + 1)).fetchone()
+            if not matches:
+                return []
+            params = [match]
+            if matches <= SEARCH_RANK_LIMIT:
+                sql = ("SELECT j.id, j.created_at, j.title, length(j.content) FROM journal_fts "
+                       "JOIN journal j ON j.id = journal_fts.rowid WHERE journal_fts MATCH ?")
+                order = "journal_fts.rank, j.created_at DESC, j.id DESC"
+            else:
+                # Too many to rank or sort: walk the date index newest first
+                # and stop after `limit` matches. Without INDEXED BY the planner
+                # sorts every match instead.
+                sql = ("SELECT j.id, j.created_at, j.title, length(j.content) FROM journal j "
+                       "INDEXED BY journal_created_at "
+                       "WHERE j.id IN (SELECT rowid FROM journal_fts WHERE journal_fts MATCH ?)")
+                order = "j.created_at DESC, j.id DESC"
+        else:
+            sql = "SELECT j.id, j.created_at, j.title, length(j.content) FROM journal j WHERE 1"
+            params = []
+            for word in words:
+                pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                sql += " AND (j.title LIKE ? ESCAPE '\\' OR j.content LIKE ? ESCAPE '\\')"
+                params += [pattern, pattern]
+            order = "j.created_at DESC, j.id DESC"
+
+        if start is not None:
+            sql += " AND j.created_at >= ?"
+            params.append(start.strftime(JOURNAL_DATE_FORMAT))
+        if end is not None:
+            sql += " AND j.created_at < ?"
+            params.append(end.strftime(JOURNAL_DATE_FORMAT))
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        return self._journal_headers(conn.execute(sql, params))
+
+    # Contacts
+
+    def add_contact(self, phone):
+        self._queue("INSERT OR IGNORE INTO contacts (phone, added_at) VALUES (?, ?)", (phone, time.time()))
+
+    def load_contacts(self):
+        return [phone for (phone,) in self.conn.execute("SELECT phone FROM contacts ORDER BY id")]
@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# How often a waiting caller checks its cancel_event.
+CANCEL_POLL_SECONDS = 0.05
+
+
+class CallerAborted(Exception):
+    """Base for errors that concern only the caller that raised them (its
+    job was cancelled, its batch stopped). They are never handed to the
+    other callers of a flight: those run the call again instead."""
+
+
+class FlightAbandoned(Exception):
+    """Raised inside the shared call once every caller has stopped listening."""
+
+
+class FlightCancelled(CallerAborted):
+    """Raised to a caller whose cancel_event was set while it waited."""
+
+
+# Result of a flight whose leader was aborted; its followers start over.
+_RERUN = object()
+
+
+class _Subscriber:
+    def __init__(self, on_partial, skip=0):
+        self.on_partial = on_partial
+        self.error = None
+        # Chunks already delivered by an earlier, aborted flight.
+        self.skip = skip
+        self.delivered = 0
+
+    def deliver(self, chunk):
+        if self.on_partial is None or self.error is not None:
+            return
+        if self.skip:
+            self.skip -= 1
+            return
+        try:
+            self.on_partial(chunk)
+            self.delivered += 1
+        except Exception as e:
+            # e.g. JobCancelled: this caller detaches, the others keep streaming.
+            self.error = e
+
+
+class _Flight:
+    def __init__(self):
+        self.future = Future()
+        self.chunks = []
+        self.subscribers = []
+        self.abandoned = False
+        self.lock = threading.Lock()
+
+    def subscribe(self, on_partial, skip=0):
+        subscriber = _Subscriber(on_partial, skip)
+        with self.lock:
+            if self.abandoned:
+                return None
+            for chunk in self.chunks:
+                subscriber.deliver(chunk)
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber, error):
+        with self.lock:
+            subscriber.error = error
+            self._check_abandoned()
+
+    def publish(self, chunk):
+        with self.lock:
+            self.chunks.append(chunk)
+            for subscriber in self.subscribers:
+                subscriber.deliver(chunk)
+            if self._check_abandoned():
+                raise FlightAbandoned()
+
+    def _check_abandoned(self):
+        if all(subscriber.error is not None for subscriber in self.subscribers):
+            self.abandoned = True
+        return self.abandoned
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller runs `fn(publish)`; later callers with the same key wait
+    for its result. Chunks passed to `publish` are replayed to late joiners
+    and streamed to everyone's `on_partial`.
+    Only results and genuine errors are shared. If the leader fails with a
+    CallerAborted, the remaining callers run their own `fn` again, one of
+    them leading. A caller whose `cancel_event` is set stops waiting and
+    gets FlightCancelled.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn, on_partial=None, cancel_event=None):
+        delivered = 0
+        while True:
+            result, delivered = self._run_once(key, fn, on_partial, cancel_event, delivered)
+            if result is not _RERUN:
+                return result
+
+    def _run_once(self, key, fn, on_partial, cancel_event, skip):
+        subscriber = None
+        while subscriber is None:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None or flight.abandoned or flight.future.done()
+                if leader:
+                    flight = self._flights[key] = _Flight()
+            # A flight abandoned between lookup and subscribe refuses new
+            # subscribers; go round again and start a fresh one.
+            subscriber = flight.subscribe(on_partial, skip)
+        with self._lock:
+            if leader:
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                flight.future.set_result(fn(flight.publish))
+            except (CallerAborted, FlightAbandoned) as e:
+                # Not the followers' business: they start over without it.
+                flight.future.set_result(_RERUN)
+                raise subscriber.error or e
+            except BaseException as e:
+                flight.future.set_exception(e)
+            finally:
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+
+        try:
+            result = self._wait(flight, subscriber, cancel_event)
+        except FlightAbandoned:
+            result = None
+        if subscriber.error is not None:
+            raise subscriber.error
+        return result, skip + subscriber.delivered
+
+    @staticmethod
+    def _wait(flight, subscriber, cancel_event):
+        if cancel_event is None:
+            return flight.future.result()
+        while True:
+            try:
+                return flight.future.result(timeout=CANCEL_POLL_SECONDS)
+            except FutureTimeout:
+                if cancel_event.is_set():
+                    flight.unsubscribe(subscriber, FlightCancelled())
+                    raise subscriber.error
+
+    def stats(self):
+        with self._lock:
+            total = self.calls + self.coalesced
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+                "coalescing_rate": self.coalesced / total if total else 0.0,
+            }
@@ -0,0 +1,85 @@
+"""Startup budget check for the GUI: time to first window and import cost.
+
+    QT_QPA_PLATFORM=offscreen python startup_profile.py MentalHealthAI.py --budget 1000
+
+Runs the app under `python -X importtime` with SEF_STARTUP_PROBE set, so it
+quits as soon as its window is up, and prints the time to window plus the
+slowest imports (self and cumulative, in ms, like -X importtime). Exits 1
+when the budget is exceeded or a module that should load on first use was
+imported during startup.
+"""
+import argparse
+import os
+import sys
+import time
+
+PROBE_ENV = "SEF_STARTUP_PROBE"
+# Loaded on first use (chart render, forum tab, first alert), never at startup.
+DEFERRED_MODULES = ("matplotlib", "PyQt6.QtWebEngineWidgets", "PyQt6.QtWebEngineCore", "twilio")
+_WINDOW_LINE = "startup: window shown at"
+
+
+def report_window_shown(app):
+    """Print when the window came up (wall clock, for the parent process) and quit."""
+    print(f"{_WINDOW_LINE} {time.time():.4f}", file=sys.stderr, flush=True)
+    app.quit()
+
+
+def parse_importtime(lines):
+    """(module, self_us, cumulative_us, depth) for each `-X importtime` line."""
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure GUI startup time and import cost.")
+    parser.add_argument("script", nargs="?", default="MentalHealthAI.py", help="app script to start")
+    parser.add_argument("--budget", type=float, default=1000, help="time-to-window budget in ms")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import subprocess
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    env = dict(os.environ, **{PROBE_ENV: "1"})
+    started = time.time()
+    result = subprocess.run([sys.executable, "-X", "importtime", args.script], env=env,
+                            capture_output=True, text=True)
+    wall_ms = (time.time() - started) * 1000
+    lines = result.stderr.splitlines()
+    shown_at = next((index for index, line in enumerate(lines) if line.startswith(_WINDOW_LINE)), None)
+    if shown_at is None:
+        print(result.stderr, file=sys.stderr)
+        print(f"{args.script} exited with {result.returncode} before showing its window", file=sys.stderr)
+        return 1
+
+    window_ms = (float(lines[shown_at].split()[-1]) - started) * 1000
+    # Imports after that line happened on first use (e.g. the chart's render thread).
+    imports = parse_importtime(lines[:shown_at])
+    print(f"Window shown after {window_ms:.0f} ms (budget {args.budget:.0f} ms), "
+          f"process exited after {wall_ms:.0f} ms")
+    print(f"{len(imports)} modules imported, "
+          f"{sum(self_us for _, self_us, _, _ in imports) / 1000:.0f} ms in imports")
+    print(f"\n{'self ms':>8} {'cumul. ms':>9}  top-level import")
+    top_level = sorted((entry for entry in imports if entry[3] == 0), key=lambda entry: -entry[2])
+    for name, self_us, cumulative_us, _ in top_level[:args.top]:
+        print(f"{self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    names = {name for name, _, _, _ in imports}
+    eager = [module for module in DEFERRED_MODULES
+             if any(name == module or name.startswith(module + ".") for name in names)]
+    if eager:
+        print(f"\nImported at startup but should load on first use: {', '.join(eager)}")
+    return 1 if eager or window_ms > args.budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
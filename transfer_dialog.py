@@ -0,0 +1,82 @@
+import threading
+import time
+
+from PyQt6.QtWidgets import QProgressDialog
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+# Save/open dialog filters and the suffix each one implies.
+FILE_FILTERS = {
+    "CSV Files (*.csv)": ".csv",
+    "JSON Lines (*.jsonl)": ".jsonl",
+    "Compressed CSV (*.csv.gz)": ".csv.gz",
+    "Compressed JSON Lines (*.jsonl.gz)": ".jsonl.gz",
+}
+FILE_FILTER = ";;".join(FILE_FILTERS)
+
+
+def with_suffix(path, selected_filter):
+    """Append the selected filter's suffix when the user typed a bare name."""
+    suffix = FILE_FILTERS.get(selected_filter, ".csv")
+    if path.lower().endswith((".csv", ".jsonl", ".json", ".gz")):
+        return path
+    return path + suffix
+
+
+class TransferThread(QThread):
+    """Runs `job(progress, cancel_event)` off the GUI thread."""
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(object, object)
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            result = self.job(self.progress.emit, self.cancel_event)
+        except Exception as e:
+            self.done.emit(None, e)
+        else:
+            self.done.emit(result, None)
+
+
+class TransferDialog(QProgressDialog):
+    """Window-modal progress for a long export or import, with Cancel.
+
+    `on_finished(result, error)` is called on the GUI thread; `error` is a
+    data_export.TransferCancelled when the user cancelled.
+    """
+
+    def __init__(self, title, label, job, on_finished, parent=None):
+        super().__init__(label, "Cancel", 0, 0, parent)
+        self.setWindowTitle(title)
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(300)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.label = label
+        self.on_finished = on_finished
+        self.started = time.monotonic()
+
+        self.worker = TransferThread(job)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.done.connect(self.finish)
+        self.canceled.connect(self.worker.cancel_event.set)
+        self.worker.start()
+
+    def update_progress(self, done, total):
+        self.setMaximum(max(total, 1))
+        self.setValue(min(done, max(total, 1)))
+        rate = done / max(time.monotonic() - self.started, 1e-6)
+        self.setLabelText(f"{self.label}\n{done:,} of {total:,} rows ({rate:,.0f} rows/s)")
+
+    def finish(self, result, error):
+        self.worker.wait()
+        self.close()
+        self.on_finished(result, error)
+
+    def stop(self):
+        """Cancel and wait; for application shutdown."""
+        self.worker.cancel_event.set()
+        self.worker.wait()
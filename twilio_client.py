@@ -0,0 +1,90 @@
+import datetime
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from http_client import RetryingClient
+
+TWILIO_API_URL = "https://api.twilio.com/2010-04-01"
+
+
+class TwilioClient(RetryingClient):
+    """Minimal Twilio REST client for sending SMS.
+
+    `api_url` is the API root (".../2010-04-01"), so tests can point it at a
+    local stand-in server. Timeouts are short: an emergency text that has
+    not been accepted within seconds should be retried or reported.
+    """
+
+    def __init__(self, account_sid, auth_token, api_url=TWILIO_API_URL, connect_timeout=5.0,
+                 read_timeout=15.0, max_retries=2, backoff_base=0.5, backoff_cap=4.0, pool_size=8):
+        super().__init__(connect_timeout, read_timeout, max_retries, backoff_base, backoff_cap, pool_size)
+        self.session.auth = (account_sid, auth_token)
+        self.messages_url = f"{api_url.rstrip('/')}/Accounts/{account_sid}/Messages.json"
+
+    def send_sms(self, to, from_, body, on_retry=None):
+        """Queue one message; returns Twilio's message resource (sid, status, ...).
+
+        Only retried when Twilio cannot have created the message (429, or
+        no connection made); a 5xx or dropped connection may have sent it,
+        so those are left to the caller to reconcile with `find_sent`.
+        """
+        response = self.post(self.messages_url, data={"To": to, "From": from_, "Body": body}, on_retry=on_retry,
+                             retry_statuses={429}, retry_error=never_sent)
+        return response.json()
+
+    def find_sent(self, to, from_, body, since):
+        """Sid of a message with `body` sent to `to` at or after `since` (a
+        timestamp), or None. Settles whether a send that got no reply went out."""
+        since_utc = datetime.datetime.fromtimestamp(since, datetime.timezone.utc)
+        # No DateSent filter: queued and sending messages have no DateSent
+        # yet. The newest page for this pair of numbers covers any resend window.
+        response = self.get(self.messages_url, params={"To": to, "From": from_, "PageSize": 100})
+        for message in response.json().get("messages", []):
+            created = message.get("date_created")
+            # Trial accounts prefix the body, so match on containment.
+            if (created and parsedate_to_datetime(created) >= since_utc
+                    and body in (message.get("body") or "")):
+                return message["sid"]
+        return None
+
+
+def is_permanent(error):
+    """True for errors that retrying cannot fix, such as an invalid number."""
+    response = getattr(error, "response", None)
+    return (isinstance(error, requests.exceptions.HTTPError) and response is not None
+            and 400 <= response.status_code < 500 and response.status_code != 429)
+
+
+def never_sent(error):
+    """True when a request failed before reaching Twilio, so resending cannot duplicate it."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def in_doubt(error):
+    """True when Twilio may have created the message despite the error:
+    no reply, a dropped connection or a 5xx. Such sends are checked with
+    `find_sent` before being repeated."""
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        return response is not None and response.status_code >= 500
+    return (isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            and not never_sent(error))
+
+
+def describe_error(error):
+    """Short reason for a failed send, preferring Twilio's own message."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        try:
+            return f"{error.response.status_code}: {error.response.json()['message']}"
+        except (ValueError, KeyError, TypeError):
+            return f"HTTP {error.response.status_code}"
+    if isinstance(error, requests.exceptions.Timeout):
+        return "Timed out"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "No connection"
+    return str(error)